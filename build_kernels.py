@@ -0,0 +1,21 @@
+"""
+Build the audio DSP kernels ahead of time
+Usage: python build_kernels.py
+"""
+
+from src import audio_kernels
+
+def main():
+    """Compile kernels to a native module (or warm the JIT cache)"""
+    
+    try:
+        output_path = audio_kernels.build_aot()
+        print(f"\n✅ Built {output_path}")
+    except ImportError:
+        # numba.pycc is deprecated and missing from newer numba releases;
+        # fill the on-disk JIT cache instead so later runs load it from disk
+        audio_kernels.warm_up()
+        print("\n⚠️ numba.pycc unavailable - JIT cache warmed instead")
+
+if __name__ == "__main__":
+    main()
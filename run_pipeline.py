@@ -33,7 +33,7 @@ def main():
         print("✅ SUCCESS!")
         print("="*60)
         print(f"\n📁 Files generated:")
-        print(f"   Raw MP3:      {result['raw_audio']}")
+        print(f"   Raw audio:    {result['raw_audio']}")
         print(f"   Refined WAV:  {result['refined_audio']}")
         
         print(f"\n📊 Metadata:")
@@ -47,7 +47,7 @@ def main():
         print(f"   Total:        {result['metadata']['total_time']}s")
         
         print(f"\n💾 File sizes:")
-        print(f"   Raw MP3:      {result['metadata']['raw_size_mb']} MB")
+        print(f"   Raw audio:    {result['metadata']['raw_size_mb']} MB")
         print(f"   Refined WAV:  {result['metadata']['refined_size_mb']} MB")
         
         print("\n✨ The refined WAV is ready for MuseTalk!")
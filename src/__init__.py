@@ -4,8 +4,13 @@ Main Audio Pipeline - Complete orchestration of TTS and refinement
 
 import os
 import time
+import queue
+import asyncio
 import logging
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 from datetime import datetime
+from functools import lru_cache
+from importlib import import_module
 from pathlib import Path
 
 from .utils import (
@@ -14,143 +19,502 @@ from .utils import (
     setup_directories, 
     setup_logging,
     validate_text_input,
-    generate_filename
+    generate_filename,
+    parse_output_format
 )
-from .tts_service import ElevenLabsTTS
-from .audio_refiner import AudioRefiner
 
 # Initialize logger
 logger = logging.getLogger(__name__)
 
-def generate_refined_audio(
-    text,
-    voice_id=None,
-    output_name=None,
-    config_path="config/config.yaml"
-):
+# The services pull in the ElevenLabs SDK, httpx, numpy, scipy, numba and
+# pydub, so they are imported on first use; `from src.utils import ...`
+# (which runs this file) stays cheap.
+_LAZY_EXPORTS = {
+    'ElevenLabsTTS': '.tts_service',
+    'AudioRefiner': '.audio_refiner',
+    'AudioCache': '.audio_cache'
+}
+
+def __getattr__(name):
+    """Import the exported service classes on first access"""
+    if name not in _LAZY_EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    
+    value = getattr(import_module(_LAZY_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+def _setup(config_path):
     """
-    Complete pipeline: Text -> Raw Audio -> Refined Audio
+    Load config, logging, directories and API key for a pipeline run
     
     Args:
-        text (str): Text to convert to speech
-        voice_id (str, optional): ElevenLabs voice ID
-        output_name (str, optional): Custom output filename (without extension)
         config_path (str): Path to config file
     
     Returns:
-        dict: Complete result with both raw and refined audio paths
+        tuple: (config dict, api_key)
     """
-    pipeline_start = time.time()
+    # Load configuration
+    config = load_config(config_path)
     
-    try:
-        # Load configuration
-        config = load_config(config_path)
+    # Setup logging
+    setup_logging(config)
+    
+    # Setup directories
+    setup_directories(config)
+    
+    # Load API key
+    api_key = load_env_variables()
+    
+    return config, api_key
+
+def _output_paths(config, output_name):
+    """
+    Build raw and refined output paths for one generation
+    
+    Args:
+        config (dict): Configuration dictionary
+        output_name (str): Output filename (without extension)
+    
+    Returns:
+        tuple: (raw_audio_path, refined_audio_path, codec, sample_rate)
+    """
+    # PCM from the API is kept as WAV; MP3 is saved as-is
+    codec, sample_rate = parse_output_format(
+        config['elevenlabs'].get('output_format', 'pcm_22050')
+    )
+    raw_extension = 'mp3' if codec == 'mp3' else 'wav'
+    
+    raw_audio_path = os.path.join(
+        config['paths']['raw_audio'],
+        f"{output_name}.{raw_extension}"
+    )
+    
+    refined_audio_path = os.path.join(
+        config['paths']['refined_audio'],
+        f"{output_name}.wav"
+    )
+    
+    return raw_audio_path, refined_audio_path, codec, sample_rate
+
+def _cached_result(text, raw_audio_path, refined_audio_path, cached_metadata, start_time):
+    """Build a pipeline result for audio served from the cache"""
+    total_time = time.time() - start_time
+    
+    logger.info(f"✓ Served from cache in {total_time:.2f}s")
+    
+    return {
+        'success': True,
+        'raw_audio': raw_audio_path,
+        'refined_audio': refined_audio_path,
+        'metadata': {
+            **cached_metadata,
+            'text': text,
+            'generation_time': 0.0,
+            'refinement_time': 0.0,
+            'total_time': round(total_time, 2),
+            'cached': True
+        },
+        'error': None
+    }
+
+def _result_metadata(text, tts_result, refine_result, total_time):
+    """Combine TTS and refinement metadata into the pipeline result metadata"""
+    return {
+        'text': text,
+        'text_length': len(text),
+        'voice_id': tts_result['metadata']['voice_id'],
+        'generation_time': tts_result['metadata']['generation_time'],
+        'refinement_time': refine_result['metadata']['processing_time'],
+        'total_time': round(total_time, 2),
+        'raw_size_mb': round(tts_result['metadata']['file_size'] / (1024*1024), 2),
+        'refined_size_mb': round(refine_result['metadata']['file_size'] / (1024*1024), 2),
+        'duration': refine_result['metadata']['output_duration'],
+        'sample_rate': refine_result['metadata']['sample_rate'],
+        'cached': False
+    }
+
+def _failed_result(error_msg):
+    """Build a pipeline result for a failed generation"""
+    logger.error(error_msg)
+    
+    return {
+        'success': False,
+        'raw_audio': None,
+        'refined_audio': None,
+        'metadata': None,
+        'error': error_msg
+    }
+
+class Pipeline:
+    """Text -> raw audio -> refined audio, with setup done once for repeated runs"""
+    
+    def __init__(self, config_path="config/config.yaml"):
+        """
+        Load config, logging, directories, API key and services
         
-        # Setup logging
-        setup_logging(config)
+        Args:
+            config_path (str): Path to config file
         
-        # Setup directories
-        setup_directories(config)
+        Raises:
+            ValueError: If elevenlabs.output_format is not a pcm_* or mp3_* format
+        """
+        from .tts_service import ElevenLabsTTS
+        from .audio_cache import AudioCache
         
-        # Load API key
-        api_key = load_env_variables()
+        self.config, self.api_key = _setup(config_path)
+        self.tts = ElevenLabsTTS(self.api_key, self.config)
+        self.cache = AudioCache(self.config)
         
-        # Validate text input
-        text = validate_text_input(text)
+        # Built on the first run, overlapped with its TTS request
+        self._refiner = None
+    
+    def _get_refiner(self):
+        """Get the audio refiner, building it on first use"""
+        if self._refiner is None:
+            from .audio_refiner import AudioRefiner
+            
+            self._refiner = AudioRefiner(self.config)
+        return self._refiner
+    
+    def run(self, text, voice_id=None, output_name=None):
+        """
+        Complete pipeline: Text -> Raw Audio -> Refined Audio
         
-        logger.info("="*60)
-        logger.info("Starting Audio Generation Pipeline")
-        logger.info(f"Text length: {len(text)} characters")
-        logger.info("="*60)
+        Args:
+            text (str): Text to convert to speech
+            voice_id (str, optional): ElevenLabs voice ID
+            output_name (str, optional): Custom output filename (without extension)
         
-        # Generate filenames
-        if output_name is None:
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            output_name = f"audio_{timestamp}"
+        Returns:
+            dict: Complete result with both raw and refined audio paths
+        """
+        pipeline_start = time.time()
+        config = self.config
+        tts = self.tts
         
-        raw_audio_path = os.path.join(
-            config['paths']['raw_audio'],
-            f"{output_name}.mp3"
-        )
+        try:
+            # Validate text input
+            text = validate_text_input(text)
+            
+            logger.info("="*60)
+            logger.info("Starting Audio Generation Pipeline")
+            logger.info(f"Text length: {len(text)} characters")
+            logger.info("="*60)
+            
+            # Generate filenames
+            if output_name is None:
+                timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+                output_name = f"audio_{timestamp}"
+            
+            raw_audio_path, refined_audio_path, codec, sample_rate = _output_paths(config, output_name)
+            
+            # Sentence splitting joins raw PCM, so it only applies to pcm_* formats
+            sentence_split = bool(config['elevenlabs'].get('sentence_split', {}).get('enabled')) and codec == 'pcm'
+            
+            # Return cached audio if this exact request was generated before
+            cache_key = self.cache.make_key(
+                text,
+                voice_id or config['elevenlabs']['default_voice_id'],
+                config,
+                sentence_split=sentence_split
+            )
+            
+            cached_metadata = self.cache.get(cache_key, raw_audio_path, refined_audio_path)
+            
+            if cached_metadata is not None:
+                return _cached_result(text, raw_audio_path, refined_audio_path, cached_metadata, pipeline_start)
+            
+            # Stream raw audio in the background; chunks are handed to the
+            # refiner through a queue so decoding overlaps with the download
+            chunk_queue = queue.Queue()
+            
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                # Build the refiner (ffmpeg probe, kernel compile/cache load) while
+                # the request is in flight
+                refiner_future = executor.submit(self._get_refiner)
+                
+                # Step 1: Generate audio with ElevenLabs
+                logger.info("Step 1: Generating audio with ElevenLabs...")
+                
+                # Validate API key
+                if not tts.validate_api_key():
+                    raise ValueError("Invalid ElevenLabs API key")
+                
+                if sentence_split:
+                    # Synthesize sentences concurrently, then refine the joined PCM
+                    tts_result = tts.generate_sentences_and_save(
+                        text=text,
+                        output_path=raw_audio_path,
+                        voice_id=voice_id
+                    )
+                    
+                    if not tts_result['success']:
+                        raise Exception(f"TTS generation failed: {tts_result['error']}")
+                    
+                    # Step 2: Refine audio
+                    logger.info("Step 2: Refining audio quality...")
+                    refiner = refiner_future.result()
+                    
+                    refine_result = refiner.process_pcm(
+                        pcm_data=tts_result['audio_data'],
+                        sample_rate=sample_rate,
+                        output_path=refined_audio_path
+                    )
+                else:
+                    def stream_tts():
+                        try:
+                            return tts.stream_and_save(
+                                text=text,
+                                output_path=raw_audio_path,
+                                on_chunk=chunk_queue.put,
+                                voice_id=voice_id
+                            )
+                        finally:
+                            chunk_queue.put(None)
+                    
+                    tts_future = executor.submit(stream_tts)
+                    
+                    # Step 2: Refine audio
+                    logger.info("Step 2: Refining audio quality...")
+                    refiner = refiner_future.result()
+                    
+                    refine_result = refiner.process_stream(
+                        chunks=iter(chunk_queue.get, None),
+                        sample_rate=sample_rate,
+                        output_path=refined_audio_path,
+                        codec=codec
+                    )
+                    
+                    tts_result = tts_future.result()
+            
+            if not tts_result['success']:
+                raise Exception(f"TTS generation failed: {tts_result['error']}")
+            
+            logger.info(f"✓ Raw audio generated: {raw_audio_path}")
+            
+            if not refine_result['success']:
+                raise Exception(f"Audio refinement failed: {refine_result['error']}")
+            
+            logger.info(f"✓ Refined audio saved: {refined_audio_path}")
+            
+            # Calculate total time
+            total_time = time.time() - pipeline_start
+            
+            logger.info("="*60)
+            logger.info("Pipeline Completed Successfully!")
+            logger.info(f"Total time: {total_time:.2f}s")
+            logger.info("="*60)
+            
+            metadata = _result_metadata(text, tts_result, refine_result, total_time)
+            
+            # Write through to the cache for repeat requests
+            self.cache.put(cache_key, raw_audio_path, refined_audio_path, metadata)
+            
+            # Return complete result
+            return {
+                'success': True,
+                'raw_audio': raw_audio_path,
+                'refined_audio': refined_audio_path,
+                'metadata': metadata,
+                'error': None
+            }
+            
+        except Exception as e:
+            return _failed_result(f"Pipeline failed: {str(e)}")
+    
+    async def run_batch(self, texts, voice_id=None, output_names=None):
+        """
+        Batch pipeline: many texts -> refined audio, concurrently
         
-        refined_audio_path = os.path.join(
-            config['paths']['refined_audio'],
-            f"{output_name}.wav"
-        )
+        TTS requests run concurrently over one shared async connection pool
+        (at most elevenlabs.batch.max_concurrency at a time), and each clip is
+        refined in a process pool as soon as its audio arrives, so network
+        waits and DSP overlap across the batch. Scripts
+        calling this should guard their entry point with
+        `if __name__ == "__main__":` (required for process pools on Windows).
         
-        # Step 1: Generate audio with ElevenLabs
-        logger.info("Step 1: Generating audio with ElevenLabs...")
-        tts = ElevenLabsTTS(api_key, config)
+        Args:
+            texts (list): Texts to convert to speech
+            voice_id (str, optional): ElevenLabs voice ID used for every text
+            output_names (list, optional): Output filenames (without extension), one per text
         
-        # Validate API key
-        if not tts.validate_api_key():
-            raise ValueError("Invalid ElevenLabs API key")
+        Returns:
+            list: One result dict per text (same shape as run), in input order
         
-        # Generate and save raw audio
-        tts_result = tts.generate_and_save(
-            text=text,
-            output_path=raw_audio_path,
-            voice_id=voice_id
-        )
+        Raises:
+            ValueError: If output_names is given and its length differs from texts
+        """
+        if output_names is not None and len(output_names) != len(texts):
+            raise ValueError(
+                f"Got {len(output_names)} output names for {len(texts)} texts"
+            )
         
-        if not tts_result['success']:
-            raise Exception(f"TTS generation failed: {tts_result['error']}")
+        from .audio_refiner import refine_file
         
-        logger.info(f"✓ Raw audio generated: {raw_audio_path}")
+        batch_start = time.time()
+        config = self.config
+        tts = self.tts
+        cache = self.cache
         
-        # Step 2: Refine audio
-        logger.info("Step 2: Refining audio quality...")
-        refiner = AudioRefiner(config)
+        if output_names is None:
+            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            output_names = [f"audio_{timestamp}_{i+1}" for i in range(len(texts))]
         
-        refine_result = refiner.process_pipeline(
-            input_path=raw_audio_path,
-            output_path=refined_audio_path
-        )
+        logger.info("="*60)
+        logger.info(f"Starting Batch Audio Generation ({len(texts)} texts)")
+        logger.info("="*60)
         
-        if not refine_result['success']:
-            raise Exception(f"Audio refinement failed: {refine_result['error']}")
+        loop = asyncio.get_running_loop()
         
-        logger.info(f"✓ Refined audio saved: {refined_audio_path}")
+        # Key validation is a blocking call (and cached after the first time)
+        if not await loop.run_in_executor(None, tts.validate_api_key):
+            return [_failed_result("Pipeline failed: Invalid ElevenLabs API key") for _ in texts]
         
-        # Calculate total time
-        total_time = time.time() - pipeline_start
+        # Stay under the plan's concurrent request limit (429s beyond it)
+        request_slots = asyncio.Semaphore(max(1, tts.batch.get('max_concurrency', 4)))
+        
+        async def run_one(text, output_name, async_client, pool):
+            item_start = time.time()
+            
+            try:
+                text = validate_text_input(text)
+                
+                raw_audio_path, refined_audio_path, _, _ = _output_paths(config, output_name)
+                
+                # Batch items are always synthesized in a single request
+                cache_key = cache.make_key(
+                    text,
+                    voice_id or config['elevenlabs']['default_voice_id'],
+                    config,
+                    sentence_split=False
+                )
+                
+                cached_metadata = cache.get(cache_key, raw_audio_path, refined_audio_path)
+                
+                if cached_metadata is not None:
+                    return _cached_result(text, raw_audio_path, refined_audio_path, cached_metadata, item_start)
+                
+                # Step 1: Generate audio with ElevenLabs
+                async with request_slots:
+                    gen_result = await tts.generate_audio_async(text, async_client, voice_id)
+                
+                if not gen_result['success']:
+                    raise Exception(f"TTS generation failed: {gen_result['error']}")
+                
+                save_result = tts.save_audio(
+                    gen_result['audio_data'],
+                    raw_audio_path,
+                    gen_result['metadata']['output_format']
+                )
+                
+                if not save_result['success']:
+                    raise Exception(f"TTS generation failed: {save_result['error']}")
+                
+                tts_result = {
+                    'metadata': {**gen_result['metadata'], 'file_size': save_result['file_size']}
+                }
+                
+                # Step 2: Refine audio in a worker process
+                refine_result = await loop.run_in_executor(
+                    pool, refine_file, config, raw_audio_path, refined_audio_path
+                )
+                
+                if not refine_result['success']:
+                    raise Exception(f"Audio refinement failed: {refine_result['error']}")
+                
+                metadata = _result_metadata(text, tts_result, refine_result, time.time() - item_start)
+                cache.put(cache_key, raw_audio_path, refined_audio_path, metadata)
+                
+                logger.info(f"✓ Refined audio saved: {refined_audio_path}")
+                
+                return {
+                    'success': True,
+                    'raw_audio': raw_audio_path,
+                    'refined_audio': refined_audio_path,
+                    'metadata': metadata,
+                    'error': None
+                }
+                
+            except Exception as e:
+                return _failed_result(f"Pipeline failed: {str(e)}")
+        
+        max_workers = max(1, min(len(texts), os.cpu_count() or 1))
+        
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            async with tts.async_session() as async_client:
+                results = await asyncio.gather(*(
+                    run_one(text, output_name, async_client, pool)
+                    for text, output_name in zip(texts, output_names)
+                ))
+        
+        total_passed = sum(1 for result in results if result['success'])
         
         logger.info("="*60)
-        logger.info("Pipeline Completed Successfully!")
-        logger.info(f"Total time: {total_time:.2f}s")
+        logger.info(f"Batch Completed: {total_passed}/{len(results)} succeeded in {time.time() - batch_start:.2f}s")
         logger.info("="*60)
         
-        # Return complete result
-        return {
-            'success': True,
-            'raw_audio': raw_audio_path,
-            'refined_audio': refined_audio_path,
-            'metadata': {
-                'text': text,
-                'text_length': len(text),
-                'voice_id': tts_result['metadata']['voice_id'],
-                'generation_time': tts_result['metadata']['generation_time'],
-                'refinement_time': refine_result['metadata']['processing_time'],
-                'total_time': round(total_time, 2),
-                'raw_size_mb': round(tts_result['metadata']['file_size'] / (1024*1024), 2),
-                'refined_size_mb': round(refine_result['metadata']['file_size'] / (1024*1024), 2),
-                'duration': refine_result['metadata']['output_duration'],
-                'sample_rate': refine_result['metadata']['sample_rate']
-            },
-            'error': None
-        }
-        
+        return list(results)
+
+@lru_cache(maxsize=4)
+def _get_pipeline(config_path):
+    """Get a shared pipeline per config path so repeated calls skip setup"""
+    return Pipeline(config_path)
+
+def generate_refined_audio(
+    text,
+    voice_id=None,
+    output_name=None,
+    config_path="config/config.yaml"
+):
+    """
+    Complete pipeline: Text -> Raw Audio -> Refined Audio
+    
+    Args:
+        text (str): Text to convert to speech
+        voice_id (str, optional): ElevenLabs voice ID
+        output_name (str, optional): Custom output filename (without extension)
+        config_path (str): Path to config file
+    
+    Returns:
+        dict: Complete result with both raw and refined audio paths
+    """
+    try:
+        pipeline = _get_pipeline(config_path)
     except Exception as e:
-        error_msg = f"Pipeline failed: {str(e)}"
-        logger.error(error_msg)
-        
-        return {
-            'success': False,
-            'raw_audio': None,
-            'refined_audio': None,
-            'metadata': None,
-            'error': error_msg
-        }
+        return _failed_result(f"Pipeline failed: {str(e)}")
+    
+    return pipeline.run(text, voice_id, output_name)
+
+async def generate_refined_audio_batch(
+    texts,
+    voice_id=None,
+    output_names=None,
+    config_path="config/config.yaml"
+):
+    """
+    Batch pipeline: many texts -> refined audio, concurrently
+    
+    See Pipeline.run_batch.
+    
+    Args:
+        texts (list): Texts to convert to speech
+        voice_id (str, optional): ElevenLabs voice ID used for every text
+        output_names (list, optional): Output filenames (without extension), one per text
+        config_path (str): Path to config file
+    
+    Returns:
+        list: One result dict per text (same shape as generate_refined_audio), in input order
+    
+    Raises:
+        ValueError: If output_names is given and its length differs from texts
+    """
+    try:
+        pipeline = _get_pipeline(config_path)
+    except Exception as e:
+        return [_failed_result(f"Pipeline failed: {str(e)}") for _ in texts]
+    
+    return await pipeline.run_batch(texts, voice_id, output_names)
 
 def quick_generate(text, voice_id=None):
     """
@@ -168,8 +532,11 @@ def quick_generate(text, voice_id=None):
 
 # Export main functions
 __all__ = [
+    'Pipeline',
     'generate_refined_audio',
+    'generate_refined_audio_batch',
     'quick_generate',
     'ElevenLabsTTS',
-    'AudioRefiner'
+    'AudioRefiner',
+    'AudioCache'
 ]
\ No newline at end of file
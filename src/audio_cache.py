@@ -0,0 +1,156 @@
+"""
+Audio Cache
+Content-addressed cache of generated audio, so repeat scripts skip TTS and refinement
+"""
+
+import os
+import json
+import shutil
+import hashlib
+import logging
+from pathlib import Path
+
+from .tts_service import resolve_model
+
+logger = logging.getLogger(__name__)
+
+class AudioCache:
+    """File-based cache of raw + refined audio keyed on everything that affects the output"""
+    
+    def __init__(self, config):
+        """
+        Initialize audio cache
+        
+        Args:
+            config (dict): Configuration dictionary
+        """
+        cache_config = config.get('cache', {})
+        
+        self.enabled = cache_config.get('enabled', True)
+        self.max_entries = cache_config.get('max_entries', 256)
+        self.cache_dir = config['paths'].get('cache', './audio_cache')
+    
+    def make_key(self, text, voice_id, config, sentence_split=False):
+        """
+        Build a deterministic cache key for a generation request
+        
+        Args:
+            text (str): Text to convert to speech
+            voice_id (str): Voice ID used
+            config (dict): Configuration dictionary
+            sentence_split (bool): Whether the audio is synthesized sentence by
+                sentence (split audio has gaps, so it must not share a key)
+        
+        Returns:
+            str: Hex digest identifying the request
+        """
+        elevenlabs_config = config['elevenlabs']
+        
+        # Whitespace differences don't change the speech; case can (e.g. "US" vs "us")
+        normalized_text = ' '.join(text.split())
+        
+        key_data = json.dumps({
+            'text': normalized_text,
+            'voice_id': voice_id,
+            'model': resolve_model(elevenlabs_config),
+            'output_format': elevenlabs_config.get('output_format'),
+            'seed': elevenlabs_config.get('seed'),
+            'sentence_split': elevenlabs_config.get('sentence_split') if sentence_split else None,
+            'settings': elevenlabs_config['settings'],
+            'refinement': config['audio_refinement']
+        }, sort_keys=True)
+        
+        return hashlib.blake2b(key_data.encode('utf-8'), digest_size=20).hexdigest()
+    
+    def _meta_path(self, key):
+        """Get the metadata path for a cache entry"""
+        return os.path.join(self.cache_dir, f"{key}.json")
+    
+    def get(self, key, raw_audio_path, refined_audio_path):
+        """
+        Look up a cache entry and copy its files to the requested paths
+        
+        Args:
+            key (str): Cache key from make_key
+            raw_audio_path (str): Where to place the cached raw audio
+            refined_audio_path (str): Where to place the cached refined audio
+        
+        Returns:
+            dict: Cached metadata, or None on a miss
+        """
+        if not self.enabled:
+            return None
+        
+        meta_path = self._meta_path(key)
+        
+        try:
+            with open(meta_path, 'r') as f:
+                entry = json.load(f)
+            
+            for cached_name, target_path in (
+                (entry['raw_file'], raw_audio_path),
+                (entry['refined_file'], refined_audio_path)
+            ):
+                os.makedirs(os.path.dirname(target_path) or '.', exist_ok=True)
+                shutil.copyfile(os.path.join(self.cache_dir, cached_name), target_path)
+            
+            # Mark as recently used for eviction
+            os.utime(meta_path)
+            
+            logger.info(f"Cache hit: {key}")
+            return entry['metadata']
+        
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Cache lookup failed: {str(e)}, regenerating")
+            return None
+    
+    def put(self, key, raw_audio_path, refined_audio_path, metadata):
+        """
+        Store generated audio in the cache
+        
+        Args:
+            key (str): Cache key from make_key
+            raw_audio_path (str): Raw audio file to store
+            refined_audio_path (str): Refined audio file to store
+            metadata (dict): Pipeline metadata to return on a hit
+        """
+        if not self.enabled:
+            return
+        
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            
+            # Raw and refined are both .wav for PCM formats, so name them by role
+            raw_file = f"{key}.raw{Path(raw_audio_path).suffix}"
+            refined_file = f"{key}.refined{Path(refined_audio_path).suffix}"
+            
+            shutil.copyfile(raw_audio_path, os.path.join(self.cache_dir, raw_file))
+            shutil.copyfile(refined_audio_path, os.path.join(self.cache_dir, refined_file))
+            
+            # Metadata is written last so a partial entry is never read as a hit
+            with open(self._meta_path(key), 'w') as f:
+                json.dump({
+                    'raw_file': raw_file,
+                    'refined_file': refined_file,
+                    'metadata': metadata
+                }, f)
+            
+            logger.info(f"Cached audio: {key}")
+            self._evict()
+        
+        except Exception as e:
+            logger.warning(f"Failed to cache audio: {str(e)}")
+    
+    def _evict(self):
+        """Remove least recently used entries beyond max_entries"""
+        entries = sorted(
+            Path(self.cache_dir).glob('*.json'),
+            key=lambda p: p.stat().st_mtime
+        )
+        
+        for meta_path in entries[:max(0, len(entries) - self.max_entries)]:
+            for cached_file in Path(self.cache_dir).glob(f"{meta_path.stem}.*"):
+                cached_file.unlink(missing_ok=True)
+            logger.info(f"Evicted cache entry: {meta_path.stem}")
@@ -4,16 +4,81 @@ Processes raw audio to improve quality for lip sync
 """
 
 import os
+import math
 import time
+import shutil
 import logging
+import subprocess
+import threading
+from collections import deque
 import numpy as np
 import soundfile as sf
-import noisereduce as nr
+from functools import lru_cache
+from scipy import signal
 from pydub import AudioSegment
-from pathlib import Path
+
+from . import audio_kernels
+from .audio_kernels import fused_normalize_compress
 
 logger = logging.getLogger(__name__)
 
+# Formats libsndfile reads directly, without an ffmpeg subprocess
+SOUNDFILE_EXTENSIONS = ('.wav', '.flac', '.ogg')
+
+# Spectral gate used for noise reduction
+NOISE_FFT_SIZE = 1024
+NOISE_HOP_SIZE = 256
+NOISE_QUIET_FRACTION = 0.1  # Share of quietest frames used as the noise profile
+NOISE_GAIN_FLOOR = 0.1      # Never attenuate a bin by more than 20 dB
+
+# Gentle compression applied by the voice enhancement step
+COMPRESSION_THRESHOLD = 0.3
+COMPRESSION_RATIO = 3.0
+
+# The refined WAV is written (and resampled) in blocks of this many seconds
+WRITE_CHUNK_SECONDS = 1.0
+
+@lru_cache(maxsize=None)
+def _discover_ffmpeg(config_ffmpeg_path):
+    """
+    Locate ffmpeg once per process
+    
+    Args:
+        config_ffmpeg_path (str): ffmpeg binary path from config, or None
+    
+    Returns:
+        tuple: (converter path for pydub or None, directory to add to PATH or None)
+    """
+    # 1. Check config file first
+    if config_ffmpeg_path:
+        if os.path.exists(config_ffmpeg_path):
+            logger.info(f"Using ffmpeg from config: {config_ffmpeg_path}")
+            return config_ffmpeg_path, os.path.dirname(config_ffmpeg_path)
+        else:
+            logger.warning(f"Configured ffmpeg path not found: {config_ffmpeg_path}")
+    
+    # 2. Check if ffmpeg is already in path
+    found = shutil.which("ffmpeg")
+    if found:
+        logger.info(f"ffmpeg found in PATH: {found}")
+        return None, None
+    
+    # Common Windows install locations to check
+    possible_paths = [
+        r"C:\ffmpeg\bin",
+        r"C:\Program Files\ffmpeg\bin",
+        os.path.expanduser(r"~\AppData\Local\Microsoft\WinGet\Packages\Gyan.FFmpeg_Microsoft.Winget.Source_8wekyb3d8bbwe\ffmpeg-7.0.2-full_build\bin"), # Common winget path
+        os.path.expanduser(r"~\AppData\Local\Microsoft\WinGet\Links"), # Winget links
+    ]
+    
+    for path in possible_paths:
+        if os.path.exists(path):
+            logger.info(f"Added ffmpeg to PATH: {path}")
+            return None, path
+    
+    logger.warning("ffmpeg not found in common locations. Ensure it is installed and in PATH.")
+    return None, None
+
 class AudioRefiner:
     """Audio refinement and processing pipeline"""
     
@@ -29,49 +94,31 @@ class AudioRefiner:
         self.output_config = self.refinement_config['output']
         
         self._configure_ffmpeg()
+        
+        # Compile (or load from cache) the DSP kernels up front so the first
+        # clip doesn't pay the JIT cost; a no-op when built ahead of time
+        audio_kernels.warm_up()
+        
         logger.info("Audio refiner initialized")
 
     def _configure_ffmpeg(self):
         """Configure ffmpeg path for pydub"""
-        import shutil
-        
-        # 1. Check config file first
-        if 'paths' in self.config and self.config['paths'].get('ffmpeg'):
-            ffmpeg_path = self.config['paths']['ffmpeg']
-            if os.path.exists(ffmpeg_path):
-                AudioSegment.converter = ffmpeg_path
-                os.environ["PATH"] += os.pathsep + os.path.dirname(ffmpeg_path)
-                logger.info(f"Using ffmpeg from config: {ffmpeg_path}")
-                return
-            else:
-                logger.warning(f"Configured ffmpeg path not found: {ffmpeg_path}")
-
-        # 2. Check if ffmpeg is already in path
-        if shutil.which("ffmpeg"):
-            logger.info(f"ffmpeg found in PATH: {shutil.which('ffmpeg')}")
-            return
-
-        # Common Windows install locations to check
-        possible_paths = [
-            r"C:\ffmpeg\bin",
-            r"C:\Program Files\ffmpeg\bin",
-            os.path.expanduser(r"~\AppData\Local\Microsoft\WinGet\Packages\Gyan.FFmpeg_Microsoft.Winget.Source_8wekyb3d8bbwe\ffmpeg-7.0.2-full_build\bin"), # Common winget path
-             os.path.expanduser(r"~\AppData\Local\Microsoft\WinGet\Links"), # Winget links
-        ]
+        converter, bin_dir = _discover_ffmpeg(self.config.get('paths', {}).get('ffmpeg'))
         
-        for path in possible_paths:
-            if os.path.exists(path):
-                # Add to PATH environment variable for pydub/subprocess
-                os.environ["PATH"] += os.pathsep + path
-                logger.info(f"Added ffmpeg to PATH: {path}")
-                return
-                
-        logger.warning("ffmpeg not found in common locations. Ensure it is installed and in PATH.")
+        if converter:
+            AudioSegment.converter = converter
+        
+        # Add to PATH environment variable for pydub/subprocess (only once)
+        if bin_dir and bin_dir not in os.environ["PATH"].split(os.pathsep):
+            os.environ["PATH"] += os.pathsep + bin_dir
     
     def load_audio(self, file_path):
         """
         Load audio file (supports MP3, WAV, etc.)
         
+        WAV/FLAC/OGG are read in-process with libsndfile; other formats
+        (MP3) go through pydub and ffmpeg.
+        
         Args:
             file_path (str): Path to audio file
         
@@ -79,23 +126,36 @@ class AudioRefiner:
             tuple: (audio_data as numpy array, sample_rate)
         """
         try:
-            # Load using pydub (handles MP3, WAV, etc.)
+            if str(file_path).lower().endswith(SOUNDFILE_EXTENSIONS):
+                audio_array, sample_rate = sf.read(file_path, dtype='float32', always_2d=False)
+                
+                # Convert to mono if stereo
+                if audio_array.ndim > 1:
+                    audio_array = audio_array.mean(axis=1, dtype=np.float32)
+                
+                logger.debug(f"Loaded audio: {file_path} (duration: {len(audio_array)/sample_rate:.2f}s, SR: {sample_rate}Hz)")
+                
+                return audio_array, sample_rate
+            
+            # Load using pydub (handles MP3, etc.)
             audio = AudioSegment.from_file(file_path)
             
             # Convert to mono if stereo
             if audio.channels > 1:
                 audio = audio.set_channels(1)
             
+            # 16-bit samples so the raw buffer can be viewed directly
+            if audio.sample_width != 2:
+                audio = audio.set_sample_width(2)
+            
             # Get sample rate
             sample_rate = audio.frame_rate
             
-            # Convert to numpy array
-            audio_array = np.array(audio.get_array_of_samples(), dtype=np.float32)
-            
-            # Normalize to -1 to 1 range
-            audio_array = audio_array / np.iinfo(audio.array_type).max
+            # Convert to float32 in the -1 to 1 range (zero-copy view, one cast)
+            audio_array = np.frombuffer(audio.raw_data, dtype=np.int16).astype(np.float32)
+            audio_array *= 1.0 / 32768.0
             
-            logger.info(f"Loaded audio: {file_path} (duration: {len(audio_array)/sample_rate:.2f}s, SR: {sample_rate}Hz)")
+            logger.debug(f"Loaded audio: {file_path} (duration: {len(audio_array)/sample_rate:.2f}s, SR: {sample_rate}Hz)")
             
             return audio_array, sample_rate
             
@@ -103,9 +163,105 @@ class AudioRefiner:
             logger.error(f"Error loading audio: {str(e)}")
             raise
     
+    def decode_pcm(self, pcm_data):
+        """
+        Convert 16-bit little-endian mono PCM bytes to audio samples
+        
+        Args:
+            pcm_data (bytes): Raw PCM as returned by ElevenLabs pcm_* formats
+        
+        Returns:
+            np.array: Audio data in the -1 to 1 range
+        """
+        # Drop a trailing half sample if the stream was cut mid-frame
+        usable = len(pcm_data) - (len(pcm_data) % 2)
+        
+        audio_array = np.frombuffer(pcm_data[:usable], dtype='<i2').astype(np.float32)
+        audio_array *= 1.0 / 32768.0
+        
+        return audio_array
+    
+    def decode_stream(self, chunks, sample_rate):
+        """
+        Decode a stream of MP3 chunks while it is still arriving
+        
+        Chunks are piped into an ffmpeg process as they come in, so decoding
+        overlaps with the network download instead of starting after it.
+        
+        Args:
+            chunks (iterable): Iterable of MP3 byte chunks (may block between chunks)
+            sample_rate (int): Sample rate to decode to
+        
+        Returns:
+            tuple: (audio_data as numpy array, sample_rate)
+        """
+        command = [
+            AudioSegment.converter,
+            '-hide_banner', '-loglevel', 'error',
+            '-f', 'mp3', '-i', 'pipe:0',
+            '-f', 's16le', '-acodec', 'pcm_s16le',
+            '-ac', '1', '-ar', str(sample_rate),
+            'pipe:1'
+        ]
+        
+        process = subprocess.Popen(
+            command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE
+        )
+        
+        feed_error = []
+        
+        def feed():
+            try:
+                for chunk in chunks:
+                    process.stdin.write(chunk)
+            except Exception as e:
+                feed_error.append(e)
+            finally:
+                try:
+                    process.stdin.close()
+                except OSError:
+                    pass
+        
+        # Drain stderr alongside stdout: a corrupt stream can log enough to
+        # fill the pipe and block ffmpeg. Only the last lines are kept.
+        stderr_tail = deque(maxlen=20)
+        
+        def drain():
+            for line in process.stderr:
+                stderr_tail.append(line)
+        
+        feeder = threading.Thread(target=feed, daemon=True)
+        drainer = threading.Thread(target=drain, daemon=True)
+        feeder.start()
+        drainer.start()
+        
+        pcm = process.stdout.read()
+        process.wait()
+        feeder.join()
+        drainer.join()
+        stderr = b''.join(stderr_tail)
+        
+        if feed_error and not isinstance(feed_error[0], BrokenPipeError):
+            raise feed_error[0]
+        
+        if process.returncode != 0:
+            raise RuntimeError(f"ffmpeg decode failed: {stderr.decode(errors='replace').strip()}")
+        
+        audio_array = self.decode_pcm(pcm)
+        
+        logger.debug(f"Decoded audio stream (duration: {len(audio_array)/sample_rate:.2f}s, SR: {sample_rate}Hz)")
+        
+        return audio_array, sample_rate
+    
     def reduce_noise(self, audio_data, sample_rate):
         """
-        Apply noise reduction to audio
+        Apply noise reduction to audio (stationary spectral gate)
+        
+        The noise floor is estimated per frequency from the quietest frames
+        and subtracted from the STFT magnitude, keeping the original phase.
         
         Args:
             audio_data (np.array): Audio data
@@ -115,24 +271,49 @@ class AudioRefiner:
             np.array: Noise-reduced audio
         """
         if not self.refinement_config['noise_reduction']['enabled']:
-            logger.info("Noise reduction disabled")
+            logger.debug("Noise reduction disabled")
             return audio_data
         
         try:
             strength = self.refinement_config['noise_reduction']['strength']
             
-            logger.info(f"Applying noise reduction (strength: {strength})")
+            logger.debug(f"Applying noise reduction (strength: {strength})")
+            
+            audio = np.asarray(audio_data, dtype=np.float32)
+            
+            if audio.size < NOISE_FFT_SIZE:
+                logger.debug("Audio shorter than one STFT frame, skipping noise reduction")
+                return audio
+            
+            noverlap = NOISE_FFT_SIZE - NOISE_HOP_SIZE
+            
+            _, _, spectrum = signal.stft(
+                audio, fs=sample_rate, nperseg=NOISE_FFT_SIZE, noverlap=noverlap
+            )
             
-            # Apply noise reduction
-            reduced_noise = nr.reduce_noise(
-                y=audio_data,
-                sr=sample_rate,
-                prop_decrease=strength,
-                stationary=True
+            magnitude = np.abs(spectrum)
+            
+            # Noise profile: mean power of the quietest frames
+            frame_energy = np.einsum('ft,ft->t', magnitude, magnitude)
+            quiet_count = max(1, int(frame_energy.size * NOISE_QUIET_FRACTION))
+            quiet_frames = np.argpartition(frame_energy, quiet_count - 1)[:quiet_count]
+            noise_floor = np.sqrt(np.mean(magnitude[:, quiet_frames] ** 2, axis=1, keepdims=True))
+            
+            # Soft mask equivalent to max(|Z| - strength * noise, floor * |Z|)
+            # applied to the complex spectrum, so phase is preserved
+            magnitude += 1e-12
+            np.divide(noise_floor, magnitude, out=magnitude)
+            magnitude *= -strength
+            magnitude += 1.0
+            np.maximum(magnitude, NOISE_GAIN_FLOOR, out=magnitude)
+            spectrum *= magnitude
+            
+            _, reduced_noise = signal.istft(
+                spectrum, fs=sample_rate, nperseg=NOISE_FFT_SIZE, noverlap=noverlap
             )
             
-            logger.info("Noise reduction completed")
-            return reduced_noise
+            logger.debug("Noise reduction completed")
+            return reduced_noise[:audio.size].astype(np.float32, copy=False)
             
         except Exception as e:
             logger.warning(f"Noise reduction failed: {str(e)}, using original audio")
@@ -150,37 +331,41 @@ class AudioRefiner:
             np.array: Normalized audio
         """
         if not self.refinement_config['normalization']['enabled']:
-            logger.info("Volume normalization disabled")
+            logger.debug("Volume normalization disabled")
             return audio_data
         
         try:
             target_db = self.refinement_config['normalization']['target_db']
             
-            logger.info(f"Normalizing volume to {target_db} dB")
+            logger.debug(f"Normalizing volume to {target_db} dB")
             
-            # Calculate current RMS
-            rms = np.sqrt(np.mean(audio_data**2))
+            # Calculate current RMS (dot product, no squared temporary array)
+            sum_squares = float(np.dot(audio_data, audio_data))
             
-            if rms == 0:
+            if sum_squares == 0:
                 logger.warning("Audio RMS is 0, skipping normalization")
                 return audio_data
             
+            rms = math.sqrt(sum_squares / audio_data.size)
+            
             # Calculate current dB
-            current_db = 20 * np.log10(rms)
+            current_db = 20 * math.log10(rms)
             
             # Calculate gain needed
             gain_db = target_db - current_db
             gain_linear = 10 ** (gain_db / 20)
             
+            # Prevent clipping: the output peak is the input peak times the
+            # gain, so cap the gain before applying it (max/min reductions
+            # avoid an abs() temporary)
+            peak = max(float(audio_data.max()), -float(audio_data.min()))
+            if peak * gain_linear > 0.95:
+                gain_linear = 0.95 / peak
+            
             # Apply gain
             normalized = audio_data * gain_linear
             
-            # Prevent clipping
-            max_val = np.max(np.abs(normalized))
-            if max_val > 0.95:
-                normalized = normalized * (0.95 / max_val)
-            
-            logger.info(f"Volume normalized (gain: {gain_db:.2f} dB)")
+            logger.debug(f"Volume normalized (gain: {gain_db:.2f} dB)")
             return normalized
             
         except Exception as e:
@@ -191,50 +376,166 @@ class AudioRefiner:
         """
         Apply voice enhancement (optional compression and EQ)
         
+        Operates in place: audio_data is modified and returned, so pass a
+        copy if the original is still needed.
+        
         Args:
             audio_data (np.array): Audio data
             sample_rate (int): Sample rate
         
         Returns:
-            np.array: Enhanced audio
+            np.array: Enhanced audio (the same buffer as audio_data)
         """
         enhancement_config = self.refinement_config['enhancement']
         
         if not (enhancement_config['compression'] or enhancement_config['eq_boost']):
-            logger.info("Voice enhancement disabled")
+            logger.debug("Voice enhancement disabled")
             return audio_data
         
         try:
-            enhanced = audio_data.copy()
+            enhanced = audio_data
             
             # Simple compression (reduce dynamic range)
             if enhancement_config['compression']:
-                logger.info("Applying gentle compression")
-                threshold = 0.3
-                ratio = 3.0
+                logger.debug("Applying gentle compression")
+                threshold = COMPRESSION_THRESHOLD
+                ratio = COMPRESSION_RATIO
                 
-                # Apply compression above threshold
-                mask = np.abs(enhanced) > threshold
-                enhanced[mask] = np.sign(enhanced[mask]) * (
-                    threshold + (np.abs(enhanced[mask]) - threshold) / ratio
-                )
+                # Apply compression above threshold. For ratio >= 1 the
+                # compressed curve lies above |x| below the threshold and
+                # below it above, so a plain minimum selects the right branch
+                # without a mask gather/scatter
+                abs_x = np.abs(enhanced)
+                curve = abs_x - threshold
+                curve /= ratio
+                curve += threshold
+                np.minimum(abs_x, curve, out=abs_x)
+                np.copysign(abs_x, enhanced, out=enhanced)
             
             # Simple EQ boost for voice frequencies (not implemented - would need scipy)
             # This is a placeholder for future enhancement
             if enhancement_config['eq_boost']:
-                logger.info("EQ boost enabled (placeholder)")
+                logger.debug("EQ boost enabled (placeholder)")
             
-            logger.info("Voice enhancement completed")
+            logger.debug("Voice enhancement completed")
             return enhanced
             
         except Exception as e:
             logger.warning(f"Enhancement failed: {str(e)}, using original audio")
             return audio_data
     
+    def resample(self, audio_data, sample_rate, target_sr):
+        """
+        Resample audio with a polyphase filter
+        
+        Uses the SoX resampler (soxr) when available, falling back to
+        scipy's resample_poly. Both run in O(N * taps) instead of a
+        whole-signal FFT.
+        
+        Args:
+            audio_data (np.array): Audio data
+            sample_rate (int): Current sample rate
+            target_sr (int): Target sample rate
+        
+        Returns:
+            np.array: Resampled audio
+        """
+        logger.debug(f"Resampling from {sample_rate}Hz to {target_sr}Hz")
+        
+        try:
+            import soxr
+            return soxr.resample(audio_data, sample_rate, target_sr, quality='HQ')
+        except ImportError:
+            from math import gcd
+            g = gcd(sample_rate, target_sr)
+            return signal.resample_poly(audio_data, target_sr // g, sample_rate // g)
+    
+    def refine_dynamics(self, audio_data):
+        """
+        Normalize volume and apply compression in a single fused kernel
+        
+        Produces the same result as normalize_volume followed by
+        enhance_voice, without the intermediate full-size arrays. A
+        contiguous float32 buffer is processed in place.
+        
+        Args:
+            audio_data (np.array): Audio data
+        
+        Returns:
+            np.array: Normalized and compressed audio
+        """
+        normalize = self.refinement_config['normalization']['enabled']
+        enhancement_config = self.refinement_config['enhancement']
+        compress = enhancement_config['compression']
+        
+        if enhancement_config['eq_boost']:
+            logger.debug("EQ boost enabled (placeholder)")
+        
+        if not (normalize or compress):
+            logger.debug("Volume normalization and compression disabled")
+            return audio_data
+        
+        target_db = self.refinement_config['normalization']['target_db']
+        
+        logger.debug(f"Normalizing to {target_db} dB / compression: {compress} (fused)")
+        
+        refined, gain_db = fused_normalize_compress(
+            np.ascontiguousarray(audio_data, dtype=np.float32),
+            float(target_db),
+            bool(normalize),
+            bool(compress),
+            COMPRESSION_THRESHOLD,
+            COMPRESSION_RATIO
+        )
+        
+        logger.debug(f"Dynamics refined (gain: {gain_db:.2f} dB)")
+        return refined
+    
+    def _output_chunks(self, audio_data, sample_rate, target_sr):
+        """
+        Yield audio in WRITE_CHUNK_SECONDS blocks at the target sample rate
+        
+        With soxr the blocks are resampled one at a time through a
+        ResampleStream (identical output to a one-shot resample), so the
+        full resampled clip is never held in memory.
+        
+        Args:
+            audio_data (np.array): Audio data (float32)
+            sample_rate (int): Current sample rate
+            target_sr (int): Target sample rate
+        
+        Yields:
+            np.array: Consecutive blocks of output audio
+        """
+        chunk_size = max(1, int(sample_rate * WRITE_CHUNK_SECONDS))
+        
+        if sample_rate != target_sr:
+            try:
+                import soxr
+            except ImportError:
+                soxr = None
+            
+            if soxr is not None:
+                stream = soxr.ResampleStream(sample_rate, target_sr, 1, dtype='float32', quality='HQ')
+                for start in range(0, len(audio_data), chunk_size):
+                    last = start + chunk_size >= len(audio_data)
+                    yield stream.resample_chunk(audio_data[start:start + chunk_size], last=last)
+                return
+            
+            # No streaming resampler: resample the whole clip up front
+            audio_data = self.resample(audio_data, sample_rate, target_sr)
+            chunk_size = max(1, int(target_sr * WRITE_CHUNK_SECONDS))
+        
+        for start in range(0, len(audio_data), chunk_size):
+            yield audio_data[start:start + chunk_size]
+    
     def save_refined(self, audio_data, sample_rate, output_path):
         """
         Save refined audio as WAV file
         
+        The file is written block by block (resampling on the way if
+        needed) rather than from one full-size buffer.
+        
         Args:
             audio_data (np.array): Audio data
             sample_rate (int): Sample rate
@@ -245,21 +546,12 @@ class AudioRefiner:
         """
         try:
             # Ensure directory exists
-            Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+            os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
             
             # Get output settings
             target_sr = self.output_config['sample_rate']
             bit_depth = self.output_config['bit_depth']
             
-            # Resample if needed
-            if sample_rate != target_sr:
-                logger.info(f"Resampling from {sample_rate}Hz to {target_sr}Hz")
-                # Simple resampling (for better quality, use librosa.resample)
-                from scipy import signal
-                num_samples = int(len(audio_data) * target_sr / sample_rate)
-                audio_data = signal.resample(audio_data, num_samples)
-                sample_rate = target_sr
-            
             # Convert to appropriate bit depth
             if bit_depth == 16:
                 subtype = 'PCM_16'
@@ -268,16 +560,16 @@ class AudioRefiner:
             else:
                 subtype = 'PCM_32'
             
-            # Save as WAV
-            sf.write(
-                output_path,
-                audio_data,
-                sample_rate,
-                subtype=subtype
-            )
+            # Save as WAV, resampling if needed
+            frames = 0
+            with sf.SoundFile(output_path, 'w', samplerate=target_sr, channels=1, subtype=subtype) as f:
+                for chunk in self._output_chunks(audio_data, sample_rate, target_sr):
+                    f.write(chunk)
+                    frames += len(chunk)
             
+            sample_rate = target_sr
             file_size = os.path.getsize(output_path)
-            duration = len(audio_data) / sample_rate
+            duration = frames / sample_rate
             
             logger.info(f"Refined audio saved: {output_path} ({file_size/(1024*1024):.2f} MB, {duration:.2f}s)")
             
@@ -319,39 +611,82 @@ class AudioRefiner:
             
             # Step 1: Load audio
             audio_data, sample_rate = self.load_audio(input_path)
-            input_duration = len(audio_data) / sample_rate
             
-            # Step 2: Reduce noise
-            audio_data = self.reduce_noise(audio_data, sample_rate)
+            return self._refine(audio_data, sample_rate, output_path, start_time)
             
-            # Step 3: Normalize volume
-            audio_data = self.normalize_volume(audio_data, self.refinement_config['normalization']['target_db'])
-            
-            # Step 4: Enhance voice
-            audio_data = self.enhance_voice(audio_data, sample_rate)
-            
-            # Step 5: Save refined audio
-            save_result = self.save_refined(audio_data, sample_rate, output_path)
-            
-            if not save_result['success']:
-                return save_result
+        except Exception as e:
+            error_msg = f"Refinement pipeline failed: {str(e)}"
+            logger.error(error_msg)
+            return {
+                'success': False,
+                'refined_audio_path': None,
+                'metadata': None,
+                'error': error_msg
+            }
+    
+    def process_pcm(self, pcm_data, sample_rate, output_path):
+        """
+        Refinement pipeline for raw PCM already in memory
+        
+        No file is read and ffmpeg is not involved, avoiding the MP3
+        encode/decode round trip entirely.
+        
+        Args:
+            pcm_data (bytes): 16-bit little-endian mono PCM
+            sample_rate (int): Sample rate of the PCM data
+            output_path (str): Output audio file path
+        
+        Returns:
+            dict: Processing result with metadata
+        """
+        start_time = time.time()
+        
+        try:
+            logger.info(f"Starting refinement pipeline (PCM, {sample_rate}Hz) -> {output_path}")
             
-            processing_time = time.time() - start_time
+            # Step 1: Convert PCM to samples
+            audio_data = self.decode_pcm(pcm_data)
             
-            logger.info(f"Refinement pipeline completed in {processing_time:.2f}s")
+            return self._refine(audio_data, sample_rate, output_path, start_time)
             
+        except Exception as e:
+            error_msg = f"Refinement pipeline failed: {str(e)}"
+            logger.error(error_msg)
             return {
-                'success': True,
-                'refined_audio_path': save_result['file_path'],
-                'metadata': {
-                    'input_duration': round(input_duration, 2),
-                    'output_duration': round(save_result['duration'], 2),
-                    'sample_rate': save_result['sample_rate'],
-                    'processing_time': round(processing_time, 2),
-                    'file_size': save_result['file_size']
-                },
-                'error': None
+                'success': False,
+                'refined_audio_path': None,
+                'metadata': None,
+                'error': error_msg
             }
+    
+    def process_stream(self, chunks, sample_rate, output_path, codec='mp3'):
+        """
+        Refinement pipeline fed by a stream of audio chunks
+        
+        Args:
+            chunks (iterable): Iterable of audio byte chunks, e.g. from a queue
+            sample_rate (int): Sample rate of the streamed audio
+            output_path (str): Output audio file path
+            codec (str): 'mp3' (decoded through ffmpeg while streaming) or
+                'pcm' (16-bit mono, used directly)
+        
+        Returns:
+            dict: Processing result with metadata
+        """
+        start_time = time.time()
+        
+        try:
+            logger.info(f"Starting streaming refinement pipeline -> {output_path}")
+            
+            # Step 1: Decode audio as it arrives
+            if codec == 'pcm':
+                audio_data = self.decode_pcm(b''.join(chunks))
+            elif codec == 'mp3':
+                audio_data, sample_rate = self.decode_stream(chunks, sample_rate)
+            else:
+                raise ValueError(f"Unsupported codec: {codec}")
+            
+            return self._refine(audio_data, sample_rate, output_path, start_time)
             
         except Exception as e:
             error_msg = f"Refinement pipeline failed: {str(e)}"
@@ -361,4 +696,88 @@ class AudioRefiner:
                 'refined_audio_path': None,
                 'metadata': None,
                 'error': error_msg
-            }
\ No newline at end of file
+            }
+    
+    def _refine(self, audio_data, sample_rate, output_path, start_time):
+        """
+        Run the refinement steps on decoded audio and save the result
+        
+        Args:
+            audio_data (np.array): Decoded audio data
+            sample_rate (int): Sample rate
+            output_path (str): Output audio file path
+            start_time (float): Pipeline start timestamp
+        
+        Returns:
+            dict: Processing result with metadata
+        """
+        input_duration = len(audio_data) / sample_rate
+        
+        # The pipeline owns audio_data from here on: it is either freshly
+        # decoded or a new array returned by the previous stage, so stages
+        # are free to modify the buffer in place instead of copying it.
+        # Audio stays float32 end to end; no stage may upcast to float64
+        assert audio_data.dtype == np.float32, f"expected float32 input, got {audio_data.dtype}"
+        
+        # Downsample to the output rate first so the DSP steps run on fewer
+        # samples (never upsample here; save_refined handles that at the end)
+        target_sr = self.output_config['sample_rate']
+        if target_sr < sample_rate:
+            audio_data = self.resample(audio_data, sample_rate, target_sr)
+            sample_rate = target_sr
+        
+        # Step 2: Reduce noise
+        audio_data = self.reduce_noise(audio_data, sample_rate)
+        assert audio_data.dtype == np.float32, f"noise reduction returned {audio_data.dtype}"
+        
+        # Steps 3-4: Normalize volume and enhance voice (fused)
+        audio_data = self.refine_dynamics(audio_data)
+        assert audio_data.dtype == np.float32, f"dynamics returned {audio_data.dtype}"
+        
+        # Step 5: Save refined audio
+        save_result = self.save_refined(audio_data, sample_rate, output_path)
+        
+        if not save_result['success']:
+            return save_result
+        
+        processing_time = time.time() - start_time
+        
+        logger.info(f"Refinement pipeline completed in {processing_time:.2f}s")
+        
+        return {
+            'success': True,
+            'refined_audio_path': save_result['file_path'],
+            'metadata': {
+                'input_duration': round(input_duration, 2),
+                'output_duration': round(save_result['duration'], 2),
+                'sample_rate': save_result['sample_rate'],
+                'processing_time': round(processing_time, 2),
+                'file_size': save_result['file_size']
+            },
+            'error': None
+        }
+
+# Refiner reused by refine_file within one worker process
+_process_refiner = None
+
+def refine_file(config, input_path, output_path):
+    """
+    Refine one audio file; picklable entry point for process pools
+    
+    Each worker process builds its AudioRefiner once and reuses it for
+    later files with the same config.
+    
+    Args:
+        config (dict): Configuration dictionary
+        input_path (str): Input audio file path
+        output_path (str): Output audio file path
+    
+    Returns:
+        dict: Processing result with metadata (see AudioRefiner.process_pipeline)
+    """
+    global _process_refiner
+    
+    if _process_refiner is None or _process_refiner.config != config:
+        _process_refiner = AudioRefiner(config)
+    
+    return _process_refiner.process_pipeline(input_path, output_path)
@@ -5,17 +5,57 @@ Handles audio generation from text using ElevenLabs API
 
 import os
 import time
+import wave
 import logging
+import httpx
 import requests
-from pathlib import Path
-from elevenlabs.client import ElevenLabs
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from elevenlabs.client import ElevenLabs, AsyncElevenLabs
 from elevenlabs import VoiceSettings
 
+from .utils import parse_output_format, split_sentences
+
 logger = logging.getLogger(__name__)
 
+# Model used for each latency_mode when no model is configured explicitly
+LATENCY_MODELS = {
+    'fastest': 'eleven_flash_v2_5',   # Lowest time-to-first-byte
+    'balanced': 'eleven_turbo_v2_5'   # Low latency, higher quality
+}
+
+def resolve_model(elevenlabs_config):
+    """
+    Get the model ID to request, from `model` or else `latency_mode`
+    
+    Args:
+        elevenlabs_config (dict): The `elevenlabs` config section
+    
+    Returns:
+        str: ElevenLabs model ID
+    """
+    model = elevenlabs_config.get('model')
+    if model:
+        return model
+    
+    latency_mode = elevenlabs_config.get('latency_mode', 'balanced')
+    if latency_mode not in LATENCY_MODELS:
+        raise ValueError(f"Unknown latency_mode: {latency_mode} (expected one of {', '.join(LATENCY_MODELS)})")
+    
+    return LATENCY_MODELS[latency_mode]
+
+@lru_cache(maxsize=None)
+def _get_client(api_key):
+    """Get a shared ElevenLabs client per API key so connections (and TLS sessions) are reused"""
+    return ElevenLabs(api_key=api_key)
+
 class ElevenLabsTTS:
     """ElevenLabs TTS service wrapper"""
     
+    # API keys already validated in this process
+    _validated_keys = set()
+    
     def __init__(self, api_key, config):
         """
         Initialize ElevenLabs TTS service
@@ -23,15 +63,25 @@ class ElevenLabsTTS:
         Args:
             api_key (str): ElevenLabs API key
             config (dict): Configuration dictionary
+        
+        Raises:
+            ValueError: If elevenlabs.output_format is not a pcm_* or mp3_* format
         """
         self.api_key = api_key
         self.config = config
-        self.client = ElevenLabs(api_key=api_key)
+        self.client = _get_client(api_key)
         
         # Get settings from config
-        self.model = config['elevenlabs']['model']
+        self.model = resolve_model(config['elevenlabs'])
         self.default_voice_id = config['elevenlabs']['default_voice_id']
         self.voice_settings = config['elevenlabs']['settings']
+        self.output_format = config['elevenlabs'].get('output_format', 'pcm_22050')
+        
+        # Fail at construction rather than on the first file written
+        parse_output_format(self.output_format)
+        self.seed = config['elevenlabs'].get('seed')
+        self.sentence_split = config['elevenlabs'].get('sentence_split', {})
+        self.batch = config['elevenlabs'].get('batch', {})
         
         logger.info(f"ElevenLabs TTS initialized with model: {self.model}")
     
@@ -39,13 +89,20 @@ class ElevenLabsTTS:
         """
         Validate that the API key is working
         
+        A key only needs one successful round-trip per process; later calls
+        return immediately.
+        
         Returns:
             bool: True if valid, False otherwise
         """
+        if self.api_key in self._validated_keys:
+            return True
+        
         try:
             # Try to get voices to test API key
             voices = self.client.voices.get_all()
             logger.info(f"API key validated successfully. {len(voices.voices)} voices available")
+            self._validated_keys.add(self.api_key)
             return True
         except Exception as e:
             logger.error(f"API key validation failed: {str(e)}")
@@ -75,7 +132,75 @@ class ElevenLabsTTS:
             logger.error(f"Error getting voices: {str(e)}")
             return []
     
-    def generate_audio(self, text, voice_id=None, settings=None):
+    def _build_voice_settings(self, settings):
+        """
+        Create an ElevenLabs VoiceSettings object from a settings dict
+        
+        Args:
+            settings (dict): Voice settings (stability, similarity_boost, etc.)
+        
+        Returns:
+            VoiceSettings: Settings object for the API
+        """
+        return VoiceSettings(
+            stability=settings.get('stability', 0.6),
+            similarity_boost=settings.get('similarity_boost', 0.8),
+            style=settings.get('style', 0.4),
+            use_speaker_boost=settings.get('use_speaker_boost', True)
+        )
+    
+    def _request_options(self, previous_text=None, next_text=None):
+        """
+        Build optional per-request parameters
+        
+        Args:
+            previous_text (str, optional): Text spoken before this request, for continuity
+            next_text (str, optional): Text spoken after this request, for continuity
+        
+        Returns:
+            dict: Extra keyword arguments for text_to_speech.convert
+        """
+        options = {}
+        
+        if self.seed is not None:
+            options['seed'] = self.seed
+        if previous_text:
+            options['previous_text'] = previous_text
+        if next_text:
+            options['next_text'] = next_text
+        
+        return options
+    
+    def _open_raw_file(self, output_path, output_format):
+        """
+        Open a file for raw API audio in the given output format
+        
+        MP3 bytes are written as-is; headerless PCM is wrapped in a WAV
+        container so the side output stays playable.
+        
+        Args:
+            output_path (str): Path of the file to create
+            output_format (str): ElevenLabs output format
+        
+        Returns:
+            tuple: (open file object, function that writes a chunk of bytes)
+        """
+        os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+        
+        codec, sample_rate = parse_output_format(output_format)
+        
+        if codec == 'pcm':
+            f = wave.open(output_path, 'wb')
+            f.setnchannels(1)
+            f.setsampwidth(2)
+            f.setframerate(sample_rate)
+            return f, f.writeframesraw
+        
+        f = open(output_path, 'wb')
+        return f, f.write
+    
+    def generate_audio(self, text, voice_id=None, settings=None, output_format=None,
+                       previous_text=None, next_text=None):
         """
         Generate audio from text using ElevenLabs
         
@@ -83,6 +208,10 @@ class ElevenLabsTTS:
             text (str): Text to convert to speech
             voice_id (str, optional): Voice ID to use. Defaults to config default
             settings (dict, optional): Custom voice settings. Defaults to config settings
+            output_format (str, optional): ElevenLabs output format, e.g. 'pcm_22050'
+                or 'mp3_44100_128'. Defaults to config output_format
+            previous_text (str, optional): Text spoken before this one, so prosody carries over
+            next_text (str, optional): Text spoken after this one
         
         Returns:
             dict: Result containing success status, audio data, and metadata
@@ -96,23 +225,23 @@ class ElevenLabsTTS:
         if settings is None:
             settings = self.voice_settings
         
+        if output_format is None:
+            output_format = self.output_format
+        
         try:
             logger.info(f"Generating audio for text (length: {len(text)} chars) with voice: {voice_id}")
             
             # Create voice settings object
-            voice_settings_obj = VoiceSettings(
-                stability=settings.get('stability', 0.6),
-                similarity_boost=settings.get('similarity_boost', 0.8),
-                style=settings.get('style', 0.4),
-                use_speaker_boost=settings.get('use_speaker_boost', True)
-            )
+            voice_settings_obj = self._build_voice_settings(settings)
             
             # Generate audio
             audio_generator = self.client.text_to_speech.convert(
                 voice_id=voice_id,
                 text=text,
                 model_id=self.model,
-                voice_settings=voice_settings_obj
+                voice_settings=voice_settings_obj,
+                output_format=output_format,
+                **self._request_options(previous_text, next_text)
             )
             
             # Collect audio bytes
@@ -129,7 +258,8 @@ class ElevenLabsTTS:
                     'voice_id': voice_id,
                     'text_length': len(text),
                     'generation_time': round(generation_time, 2),
-                    'audio_size': len(audio_data)
+                    'audio_size': len(audio_data),
+                    'output_format': output_format
                 },
                 'error': None
             }
@@ -144,24 +274,110 @@ class ElevenLabsTTS:
                 'error': error_msg
             }
     
-    def save_audio(self, audio_data, output_path):
+    @asynccontextmanager
+    async def async_session(self):
+        """
+        Async ElevenLabs client sharing one keep-alive connection pool
+        
+        Use one session for a group of concurrent generate_audio_async
+        calls; connections are closed when the block exits.
+        
+        Yields:
+            AsyncElevenLabs: Client to pass to generate_audio_async
+        """
+        timeout = self.batch.get('timeout', 60)
+        
+        async with httpx.AsyncClient(timeout=timeout) as http_client:
+            yield AsyncElevenLabs(api_key=self.api_key, httpx_client=http_client)
+    
+    async def generate_audio_async(self, text, async_client, voice_id=None, settings=None, output_format=None):
+        """
+        Generate audio from text without blocking the event loop
+        
+        Args:
+            text (str): Text to convert to speech
+            async_client (AsyncElevenLabs): Client from async_session()
+            voice_id (str, optional): Voice ID to use. Defaults to config default
+            settings (dict, optional): Custom voice settings. Defaults to config settings
+            output_format (str, optional): ElevenLabs output format. Defaults to config output_format
+        
+        Returns:
+            dict: Result containing success status, audio data, and metadata (same shape as generate_audio)
+        """
+        start_time = time.time()
+        
+        if voice_id is None:
+            voice_id = self.default_voice_id
+        
+        if settings is None:
+            settings = self.voice_settings
+        
+        if output_format is None:
+            output_format = self.output_format
+        
+        try:
+            logger.info(f"Generating audio (async) for text (length: {len(text)} chars) with voice: {voice_id}")
+            
+            chunks = []
+            async for chunk in async_client.text_to_speech.convert(
+                voice_id=voice_id,
+                text=text,
+                model_id=self.model,
+                voice_settings=self._build_voice_settings(settings),
+                output_format=output_format,
+                **self._request_options()
+            ):
+                chunks.append(chunk)
+            
+            audio_data = b''.join(chunks)
+            
+            generation_time = time.time() - start_time
+            
+            logger.info(f"Audio generated successfully in {generation_time:.2f}s")
+            
+            return {
+                'success': True,
+                'audio_data': audio_data,
+                'metadata': {
+                    'voice_id': voice_id,
+                    'text_length': len(text),
+                    'generation_time': round(generation_time, 2),
+                    'audio_size': len(audio_data),
+                    'output_format': output_format
+                },
+                'error': None
+            }
+            
+        except Exception as e:
+            error_msg = f"Error generating audio: {str(e)}"
+            logger.error(error_msg)
+            return {
+                'success': False,
+                'audio_data': None,
+                'metadata': None,
+                'error': error_msg
+            }
+    
+    def save_audio(self, audio_data, output_path, output_format=None):
         """
         Save audio data to file
         
         Args:
             audio_data (bytes): Audio data to save
             output_path (str): Path where to save the audio file
+            output_format (str, optional): Format of audio_data. Defaults to config output_format
         
         Returns:
             dict: Result containing success status and file info
         """
+        if output_format is None:
+            output_format = self.output_format
+        
         try:
-            # Ensure directory exists
-            Path(output_path).parent.mkdir(parents=True, exist_ok=True)
-            
             # Write audio data
-            with open(output_path, 'wb') as f:
-                f.write(audio_data)
+            f, write = self._open_raw_file(output_path, output_format)
+            with f:
+                write(audio_data)
             
             file_size = os.path.getsize(output_path)
             file_size_mb = file_size / (1024 * 1024)
@@ -205,7 +421,11 @@ class ElevenLabsTTS:
             return gen_result
         
         # Save audio
-        save_result = self.save_audio(gen_result['audio_data'], output_path)
+        save_result = self.save_audio(
+            gen_result['audio_data'],
+            output_path,
+            gen_result['metadata']['output_format']
+        )
         
         if not save_result['success']:
             return save_result
@@ -220,4 +440,176 @@ class ElevenLabsTTS:
                 'output_path': output_path
             },
             'error': None
-        }
\ No newline at end of file
+        }
+    
+    def stream_and_save(self, text, output_path, on_chunk, voice_id=None, settings=None):
+        """
+        Stream audio from ElevenLabs, saving and forwarding chunks as they arrive
+        
+        Unlike generate_and_save, nothing waits for the full response: every
+        chunk is written to disk and handed to on_chunk immediately, so the
+        caller can start decoding while synthesis is still running.
+        
+        Args:
+            text (str): Text to convert to speech
+            output_path (str): Where to save the audio
+            on_chunk (callable): Called with each audio chunk (bytes)
+            voice_id (str, optional): Voice ID to use
+            settings (dict, optional): Custom voice settings
+        
+        Returns:
+            dict: Result with file info and metadata (same shape as generate_and_save)
+        """
+        start_time = time.time()
+        
+        if voice_id is None:
+            voice_id = self.default_voice_id
+        
+        if settings is None:
+            settings = self.voice_settings
+        
+        try:
+            logger.info(f"Streaming audio for text (length: {len(text)} chars) with voice: {voice_id}")
+            
+            audio_stream = self.client.text_to_speech.convert_as_stream(
+                voice_id=voice_id,
+                text=text,
+                model_id=self.model,
+                voice_settings=self._build_voice_settings(settings),
+                output_format=self.output_format,
+                **self._request_options()
+            )
+            
+            first_chunk_time = None
+            audio_size = 0
+            
+            f, write = self._open_raw_file(output_path, self.output_format)
+            
+            with f:
+                for chunk in audio_stream:
+                    if not chunk:
+                        continue
+                    if first_chunk_time is None:
+                        first_chunk_time = time.time() - start_time
+                        logger.info(f"First audio chunk received in {first_chunk_time:.2f}s")
+                    write(chunk)
+                    on_chunk(chunk)
+                    audio_size += len(chunk)
+            
+            generation_time = time.time() - start_time
+            file_size = os.path.getsize(output_path)
+            
+            logger.info(f"Audio streamed successfully in {generation_time:.2f}s ({file_size/(1024*1024):.2f} MB)")
+            
+            return {
+                'success': True,
+                'file_path': output_path,
+                'metadata': {
+                    'voice_id': voice_id,
+                    'text_length': len(text),
+                    'generation_time': round(generation_time, 2),
+                    'first_chunk_time': round(first_chunk_time or generation_time, 2),
+                    'audio_size': audio_size,
+                    'output_format': self.output_format,
+                    'file_size': file_size,
+                    'output_path': output_path
+                },
+                'error': None
+            }
+            
+        except Exception as e:
+            error_msg = f"Error streaming audio: {str(e)}"
+            logger.error(error_msg)
+            return {
+                'success': False,
+                'file_path': None,
+                'metadata': None,
+                'error': error_msg
+            }
+    
+    def generate_sentences_and_save(self, text, output_path, voice_id=None, settings=None):
+        """
+        Synthesize each sentence concurrently and join them with short silent gaps
+        
+        Each request gets its neighbouring sentences as context (and the
+        configured seed) so the voice stays consistent across sentences.
+        Requires a PCM output format, since raw PCM can be joined directly.
+        
+        Args:
+            text (str): Text to convert to speech
+            output_path (str): Where to save the joined audio
+            voice_id (str, optional): Voice ID to use
+            settings (dict, optional): Custom voice settings
+        
+        Returns:
+            dict: Result with file info, joined PCM ('audio_data') and metadata
+        """
+        start_time = time.time()
+        
+        if voice_id is None:
+            voice_id = self.default_voice_id
+        
+        try:
+            codec, sample_rate = parse_output_format(self.output_format)
+            if codec != 'pcm':
+                raise ValueError(f"Sentence splitting requires a PCM output format, got {self.output_format}")
+            
+            sentences = split_sentences(text)
+            max_workers = max(1, min(len(sentences), self.sentence_split.get('max_workers', 8)))
+            
+            logger.info(f"Generating {len(sentences)} sentences concurrently with voice: {voice_id}")
+            
+            def generate(i):
+                result = self.generate_audio(
+                    sentences[i],
+                    voice_id,
+                    settings,
+                    previous_text=' '.join(sentences[:i]),
+                    next_text=' '.join(sentences[i+1:])
+                )
+                if not result['success']:
+                    raise RuntimeError(result['error'])
+                return result['audio_data']
+            
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                parts = list(executor.map(generate, range(len(sentences))))
+            
+            # 16-bit silence between sentences
+            gap = bytes(2 * int(self.sentence_split.get('gap_seconds', 0.15) * sample_rate))
+            audio_data = gap.join(part[:len(part) & ~1] for part in parts)
+            
+            save_result = self.save_audio(audio_data, output_path)
+            
+            if not save_result['success']:
+                return save_result
+            
+            generation_time = time.time() - start_time
+            
+            logger.info(f"Sentences generated successfully in {generation_time:.2f}s")
+            
+            return {
+                'success': True,
+                'file_path': output_path,
+                'audio_data': audio_data,
+                'metadata': {
+                    'voice_id': voice_id,
+                    'text_length': len(text),
+                    'sentences': len(sentences),
+                    'generation_time': round(generation_time, 2),
+                    'audio_size': len(audio_data),
+                    'output_format': self.output_format,
+                    'file_size': save_result['file_size'],
+                    'output_path': output_path
+                },
+                'error': None
+            }
+            
+        except Exception as e:
+            error_msg = f"Error generating sentences: {str(e)}"
+            logger.error(error_msg)
+            return {
+                'success': False,
+                'file_path': None,
+                'metadata': None,
+                'error': error_msg
+            }
@@ -3,26 +3,143 @@ Utility functions for the audio pipeline
 """
 
 import os
-import yaml
+import re
+import copy
+import time
+import queue
+import atexit
 import logging
-from pathlib import Path
-from datetime import datetime
-from dotenv import load_dotenv
+from collections import ChainMap
+from functools import lru_cache
+from logging.handlers import QueueHandler, QueueListener, MemoryHandler
 
-def load_config(config_path="config/config.yaml"):
-    """Load configuration from YAML file"""
+# Parsed copy of a config file, stored next to it (config.yaml -> config.yaml.json)
+CONFIG_SIDECAR_SUFFIX = '.json'
+
+# Parsed configs by path: ((mtime_ns, size), config)
+_CFG_CACHE = {}
+
+def _parse_yaml_config(config_path):
+    """Parse a YAML config file"""
+    # Imported here so helpers like validate_text_input don't pay for PyYAML
+    import yaml
+    
+    # libyaml-backed loader when PyYAML was built with it
+    try:
+        from yaml import CSafeLoader as YamlLoader
+    except ImportError:
+        from yaml import SafeLoader as YamlLoader
+    
     try:
         with open(config_path, 'r') as f:
-            config = yaml.safe_load(f)
-        return config
-    except FileNotFoundError:
-        raise FileNotFoundError(f"Config file not found: {config_path}")
+            return yaml.load(f, Loader=YamlLoader)
     except yaml.YAMLError as e:
         raise ValueError(f"Error parsing config file: {e}")
 
+@lru_cache(maxsize=None)
+def _json_codec():
+    """(loads, dumps) for the config sidecar: orjson if installed, else the stdlib json module"""
+    # Imported on first use, like PyYAML, to keep this module cheap to import
+    try:
+        from orjson import loads, dumps
+    except ImportError:
+        import json
+        loads = json.loads
+        
+        def dumps(obj):
+            return json.dumps(obj).encode('utf-8')
+    
+    return loads, dumps
+
+def _read_config_sidecar(config_path, source):
+    """Load the JSON sidecar if it was written for this exact config file version, else None"""
+    sidecar_path = os.fspath(config_path) + CONFIG_SIDECAR_SUFFIX
+    json_loads, _ = _json_codec()
+    
+    try:
+        with open(sidecar_path, 'rb') as f:
+            sidecar = json_loads(f.read())
+    except (OSError, ValueError):
+        return None
+    
+    # Compare against the stamp stored inside the sidecar rather than file
+    # mtimes: copies (cp -p, rsync -a, tar, Docker COPY) can leave a new
+    # YAML file with an older mtime than a stale sidecar.
+    if not isinstance(sidecar, dict) or sidecar.get('source') != list(source):
+        return None
+    
+    return sidecar.get('config')
+
+def _write_config_sidecar(config_path, source, config):
+    """Store a parsed config as a JSON sidecar, stamped with its source file (best effort)"""
+    sidecar_path = os.fspath(config_path) + CONFIG_SIDECAR_SUFFIX
+    json_loads, json_dumps = _json_codec()
+    
+    try:
+        data = json_dumps({'source': list(source), 'config': config})
+        
+        # Only if JSON holds the config exactly (no dates, non-string keys, ...)
+        if json_loads(data)['config'] != config:
+            return
+        
+        # Write then rename, so a concurrent reader never sees a partial file
+        tmp_path = f"{sidecar_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, sidecar_path)
+    except (OSError, TypeError, ValueError):
+        pass
+
+def load_config(config_path="config/config.yaml"):
+    """
+    Load configuration from YAML file
+    
+    The file is parsed once per version (keyed on its mtime and size); callers get
+    their own deep copy, so modifying the result never affects later calls.
+    Use load_config.cache_clear() to force a re-parse.
+    
+    Across processes, the parsed config is kept in a JSON sidecar next to
+    the YAML file and is used only while the YAML file's mtime and size
+    match the ones it was parsed from.
+    """
+    # Accept pathlib paths; cache entries are keyed on the string form
+    config_path = os.fspath(config_path)
+    
+    try:
+        stat = os.stat(config_path)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Config file not found: {config_path}")
+    
+    source = (stat.st_mtime_ns, stat.st_size)
+    
+    cached = _CFG_CACHE.get(config_path)
+    if cached is None or cached[0] != source:
+        config = _read_config_sidecar(config_path, source)
+        
+        if config is None:
+            config = _parse_yaml_config(config_path)
+            _write_config_sidecar(config_path, source, config)
+        
+        cached = (source, config)
+        _CFG_CACHE[config_path] = cached
+    
+    return copy.deepcopy(cached[1])
+
+load_config.cache_clear = _CFG_CACHE.clear
+
+# Whether .env has been read into os.environ in this process
+_ENV_LOADED = False
+
 def load_env_variables():
-    """Load environment variables from .env file"""
-    load_dotenv()
+    """Load environment variables from .env file (read once per process)"""
+    global _ENV_LOADED
+    
+    if not _ENV_LOADED:
+        from dotenv import load_dotenv
+        
+        load_dotenv()
+        _ENV_LOADED = True
+    
     api_key = os.getenv('ELEVENLABS_API_KEY')
     
     if not api_key:
@@ -33,6 +150,9 @@ def load_env_variables():
     
     return api_key
 
+# Directories already created (or found) in this process
+_DIRS_OK = set()
+
 def setup_directories(config):
     """Create necessary directories if they don't exist"""
     directories = [
@@ -42,53 +162,173 @@ def setup_directories(config):
     ]
     
     for directory in directories:
-        Path(directory).mkdir(parents=True, exist_ok=True)
+        if directory in _DIRS_OK:
+            continue
+        os.makedirs(directory, exist_ok=True)
+        _DIRS_OK.add(directory)
     
-    logging.info(f"Directories verified: {', '.join(directories)}")
+    if logging.getLogger().isEnabledFor(logging.INFO):
+        logging.info(f"Directories verified: {', '.join(directories)}")
+
+# Logging settings used when the config's logging section leaves them out
+_LOG_DEFAULTS = {
+    'level': 'INFO',
+    'format': '%(asctime)s - %(levelname)s - %(message)s',
+    'file_enabled': True
+}
+
+# Config level names -> logging levels
+_LEVELS = {
+    'DEBUG': logging.DEBUG,
+    'INFO': logging.INFO,
+    'WARNING': logging.WARNING,
+    'ERROR': logging.ERROR,
+    'CRITICAL': logging.CRITICAL
+}
+
+# Background thread writing queued log records to the console/file handlers
+_LOG_LISTENER = None
+
+# Logger returned by setup_logging once logging is configured
+_LOGGER = None
+
+def _stop_log_listener():
+    """Stop the log listener, writing out queued and buffered records"""
+    global _LOG_LISTENER
+    
+    if _LOG_LISTENER is not None:
+        _LOG_LISTENER.stop()
+        for handler in _LOG_LISTENER.handlers:
+            handler.flush()
+        _LOG_LISTENER = None
+
+atexit.register(_stop_log_listener)
+
+def _restore_log_handlers():
+    """In a forked child the listener thread is gone, so log through its handlers directly"""
+    if _LOG_LISTENER is not None:
+        # Unbuffered: pool workers exit without running atexit flushes
+        logging.getLogger().handlers = [
+            getattr(handler, 'target', None) or handler
+            for handler in _LOG_LISTENER.handlers
+        ]
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_restore_log_handlers)
 
 def setup_logging(config):
-    """Configure logging based on config settings"""
-    log_config = config.get('logging', {})
-    log_level = getattr(logging, log_config.get('level', 'INFO'))
-    log_format = log_config.get('format', '%(asctime)s - %(levelname)s - %(message)s')
+    """
+    Configure logging based on config settings
+    
+    Records are put on a queue and written by a listener thread, so
+    logging from the pipeline never waits on console or file I/O. Like
+    logging.basicConfig, this does nothing if logging is already set up;
+    repeated calls return immediately.
+    """
+    global _LOG_LISTENER, _LOGGER
+    
+    if _LOGGER is not None:
+        return _LOGGER
+    
+    root = logging.getLogger()
+    if root.handlers:
+        return logging.getLogger(__name__)
+    
+    log_config = ChainMap(config.get('logging') or {}, _LOG_DEFAULTS)
+    log_level = _LEVELS.get(log_config['level'], logging.INFO)
+    log_format = log_config['format']
+    
+    formatter = logging.Formatter(log_format)
     
     # Console handler
-    handlers = [logging.StreamHandler()]
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(formatter)
+    handlers = [console_handler]
     
     # File handler if enabled
-    if log_config.get('file_enabled', True):
+    if log_config['file_enabled']:
         log_dir = config['paths']['logs']
-        log_file = os.path.join(log_dir, f"audio_pipeline_{datetime.now().strftime('%Y%m%d')}.log")
-        handlers.append(logging.FileHandler(log_file))
+        log_file = os.path.join(log_dir, f"audio_pipeline_{time.strftime('%Y%m%d')}.log")
+        file_handler = logging.FileHandler(log_file)
+        file_handler.setFormatter(formatter)
+        
+        # Batch file writes; ERROR and above are written out immediately
+        buffered_handler = MemoryHandler(
+            capacity=1024,
+            flushLevel=logging.ERROR,
+            target=file_handler,
+            flushOnClose=True
+        )
+        handlers.append(buffered_handler)
+    
+    log_queue = queue.Queue(-1)
+    _LOG_LISTENER = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _LOG_LISTENER.start()
     
-    logging.basicConfig(
-        level=log_level,
-        format=log_format,
-        handlers=handlers
-    )
+    root.addHandler(QueueHandler(log_queue))
+    root.setLevel(log_level)
     
-    return logging.getLogger(__name__)
+    _LOGGER = logging.getLogger(__name__)
+    return _LOGGER
+
+def reset_logging():
+    """Undo setup_logging (flushing and closing its handlers) so the next call configures logging again"""
+    global _LOGGER
+    
+    listener = _LOG_LISTENER
+    
+    if listener is not None:
+        root = logging.getLogger()
+        for handler in root.handlers[:]:
+            if isinstance(handler, QueueHandler) and handler.queue is listener.queue:
+                root.removeHandler(handler)
+        
+        _stop_log_listener()
+        
+        for handler in listener.handlers:
+            # MemoryHandler.close() clears its target, so grab it first
+            target = getattr(handler, 'target', None)
+            handler.close()
+            if target is not None:
+                target.close()
+    
+    _LOGGER = None
+
+# Last formatted filename timestamp: (epoch second, string)
+_LAST_TS = (0, "")
 
 def generate_filename(prefix, extension, timestamp=True):
     """Generate a unique filename with optional timestamp"""
+    global _LAST_TS
+    
     if timestamp:
-        timestamp_str = datetime.now().strftime('%Y%m%d_%H%M%S')
-        return f"{prefix}_{timestamp_str}.{extension}"
+        # The timestamp has one-second resolution, so format it once per second
+        now = int(time.time())
+        if now != _LAST_TS[0]:
+            _LAST_TS = (now, time.strftime('%Y%m%d_%H%M%S', time.localtime(now)))
+        return f"{prefix}_{_LAST_TS[1]}.{extension}"
     return f"{prefix}.{extension}"
 
 def get_file_size(file_path):
-    """Get file size in MB"""
-    if os.path.exists(file_path):
-        size_bytes = os.path.getsize(file_path)
-        size_mb = size_bytes / (1024 * 1024)
-        return round(size_mb, 2)
-    return 0
+    """Get file size in MB (truncated to two decimals)"""
+    # One stat call instead of exists() + getsize()
+    try:
+        size_bytes = os.stat(file_path).st_size
+    except OSError:
+        return 0
+    # Hundredths of a MB in integer arithmetic: x * 100 / 2**20
+    return (size_bytes * 100 >> 20) / 100.0
 
 def validate_text_input(text, min_length=1, max_length=5000):
     """Validate text input for TTS"""
     if not text or not isinstance(text, str):
         raise ValueError("Text must be a non-empty string")
     
+    # Reject over-long text without copying it; only text with edge
+    # whitespace could still fit after stripping
+    if len(text) > max_length and not (text[0].isspace() or text[-1].isspace()):
+        raise ValueError(f"Text too long. Maximum {max_length} characters allowed")
+    
     text = text.strip()
     
     if len(text) < min_length:
@@ -102,7 +342,79 @@ def validate_text_input(text, min_length=1, max_length=5000):
 def format_duration(seconds):
     """Format duration in seconds to human-readable format"""
     if seconds < 60:
-        return f"{seconds:.2f}s"
-    minutes = int(seconds // 60)
-    secs = seconds % 60
-    return f"{minutes}m {secs:.2f}s"
\ No newline at end of file
+        return "%.2fs" % seconds
+    minutes, secs = divmod(seconds, 60)
+    return "%dm %.2fs" % (minutes, secs)
+
+# Words whose trailing period does not end a sentence
+SENTENCE_ABBREVIATIONS = frozenset({
+    'mr', 'mrs', 'ms', 'dr', 'prof', 'sr', 'jr', 'st', 'vs', 'etc', 'e.g', 'i.e', 'no', 'inc', 'ltd'
+})
+
+_SENTENCE_END = re.compile(r'[.!?]+["\')\]]*\s+')
+
+def split_sentences(text, min_length=10):
+    """
+    Split text into sentences for per-sentence synthesis
+    
+    Breaks after ., ! or ? followed by whitespace, except after common
+    abbreviations (Dr., Mr., ...). Decimals like 3.5 never split since
+    there is no whitespace after the point. Fragments shorter than
+    min_length are merged into the following sentence.
+    
+    Args:
+        text (str): Text to split
+        min_length (int): Minimum sentence length in characters
+    
+    Returns:
+        list: Sentences, in order, covering all of the text
+    """
+    sentences = []
+    pending = ''
+    start = 0
+    
+    for match in _SENTENCE_END.finditer(text):
+        words = text[start:match.start()].split()
+        if match.group().startswith('.') and words and words[-1].lower() in SENTENCE_ABBREVIATIONS:
+            continue
+        
+        pending += text[start:match.end()]
+        start = match.end()
+        
+        if len(pending.strip()) >= min_length:
+            sentences.append(pending.strip())
+            pending = ''
+    
+    pending = (pending + text[start:]).strip()
+    if pending:
+        # A short tail joins the previous sentence rather than being synthesized alone
+        if sentences and len(pending) < min_length:
+            sentences[-1] = f"{sentences[-1]} {pending}"
+        else:
+            sentences.append(pending)
+    
+    return sentences
+
+# ElevenLabs codecs the pipeline can store and decode (ulaw, alaw, opus are not)
+SUPPORTED_CODECS = ('pcm', 'mp3')
+
+def parse_output_format(output_format):
+    """
+    Split an ElevenLabs output format (e.g. 'mp3_44100_128', 'pcm_22050') into (codec, sample_rate)
+    
+    Raises:
+        ValueError: If the format is malformed or its codec is not in SUPPORTED_CODECS
+    """
+    try:
+        parts = output_format.split('_')
+        codec, sample_rate = parts[0], int(parts[1])
+    except (AttributeError, IndexError, ValueError):
+        raise ValueError(f"Unrecognized output format: {output_format}")
+    
+    if codec not in SUPPORTED_CODECS:
+        raise ValueError(
+            f"Unsupported output format: {output_format} "
+            f"(supported codecs: {', '.join(SUPPORTED_CODECS)})"
+        )
+    
+    return codec, sample_rate
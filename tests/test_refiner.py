@@ -0,0 +1,249 @@
+"""
+Offline tests for the audio cache and refinement helpers (no API calls)
+"""
+
+import sys
+import os
+import shutil
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import pytest
+
+from src import utils
+from src.audio_cache import AudioCache
+from src.audio_refiner import AudioRefiner, NOISE_FFT_SIZE, COMPRESSION_THRESHOLD, COMPRESSION_RATIO
+from src.tts_service import ElevenLabsTTS
+from src.utils import load_config, split_sentences, parse_output_format
+
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), '..', 'config', 'config.yaml')
+
+def _refiner(tmp_path):
+    """Refiner built from a copy of the repo config (so no sidecar is written into config/)"""
+    config_path = tmp_path / "config.yaml"
+    shutil.copyfile(CONFIG_PATH, config_path)
+    config = load_config(str(config_path))
+    config['paths']['ffmpeg'] = None
+    return AudioRefiner(config)
+
+def _speech_like(n=22050, seed=0):
+    """Short tone bursts over low noise (peaky enough to reach the compressor), float32"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(n) / 22050
+    envelope = (np.sin(2 * np.pi * 3 * t) > 0.8).astype(np.float32)
+    tone = 0.6 * np.sin(2 * np.pi * 220 * t) * envelope
+    return (tone + 0.01 * rng.standard_normal(n)).astype(np.float32)
+
+def _masked_compress(audio, threshold, ratio):
+    """Compressor as originally written in enhance_voice"""
+    out = audio.copy()
+    mask = np.abs(out) > threshold
+    out[mask] = np.sign(out[mask]) * (threshold + (np.abs(out[mask]) - threshold) / ratio)
+    return out
+
+def _cache_config(cache_dir, output_format="pcm_22050"):
+    """Minimal config for AudioCache"""
+    return {
+        'elevenlabs': {
+            'model': "eleven_turbo_v2_5",
+            'output_format': output_format,
+            'settings': {'stability': 0.6}
+        },
+        'audio_refinement': {},
+        'cache': {'enabled': True, 'max_entries': 8},
+        'paths': {'cache': str(cache_dir)}
+    }
+
+def test_cache_pcm_round_trip(tmp_path):
+    """Raw and refined are both .wav for PCM output; each must come back as itself"""
+    config = _cache_config(tmp_path / "cache")
+    cache = AudioCache(config)
+    key = cache.make_key("Hello there.", "voice", config)
+    
+    raw_path = tmp_path / "a_raw.wav"
+    refined_path = tmp_path / "a_refined.wav"
+    raw_path.write_bytes(b"raw audio")
+    refined_path.write_bytes(b"refined audio")
+    
+    cache.put(key, str(raw_path), str(refined_path), {'duration': 1.0})
+    
+    raw_out = tmp_path / "out" / "b_raw.wav"
+    refined_out = tmp_path / "out" / "b_refined.wav"
+    metadata = cache.get(key, str(raw_out), str(refined_out))
+    
+    assert metadata == {'duration': 1.0}
+    assert raw_out.read_bytes() == b"raw audio"
+    assert refined_out.read_bytes() == b"refined audio"
+
+def test_cache_miss_and_disabled(tmp_path):
+    """Unknown keys miss; a disabled cache neither stores nor serves"""
+    config = _cache_config(tmp_path / "cache")
+    cache = AudioCache(config)
+    
+    assert cache.get("0" * 40, str(tmp_path / "r.wav"), str(tmp_path / "f.wav")) is None
+    
+    config['cache']['enabled'] = False
+    disabled = AudioCache(config)
+    raw_path = tmp_path / "raw.wav"
+    raw_path.write_bytes(b"raw")
+    disabled.put("k", str(raw_path), str(raw_path), {})
+    
+    assert not (tmp_path / "cache").exists()
+
+def test_cache_key_normalizes_whitespace(tmp_path):
+    """Whitespace-only differences share a key; voice and format do not"""
+    config = _cache_config(tmp_path)
+    cache = AudioCache(config)
+    key = cache.make_key("Hello  there.\n", "voice", config)
+    
+    assert key == cache.make_key(" Hello there.", "voice", config)
+    assert key != cache.make_key("Hello there.", "other", config)
+    assert key != cache.make_key("Hello there.", "voice", _cache_config(tmp_path, "mp3_44100_128"))
+
+def test_cache_key_depends_on_synthesis_path(tmp_path):
+    """Split (with gaps) and single-request audio never share a key"""
+    config = _cache_config(tmp_path)
+    config['elevenlabs']['sentence_split'] = {'enabled': True, 'gap_seconds': 0.15}
+    cache = AudioCache(config)
+    
+    split_key = cache.make_key("One sentence here. Another one here.", "voice", config, sentence_split=True)
+    single_key = cache.make_key("One sentence here. Another one here.", "voice", config)
+    
+    assert split_key != single_key
+
+def test_refine_dynamics_matches_separate_steps(tmp_path):
+    """Fused kernel == normalize_volume followed by enhance_voice"""
+    refiner = _refiner(tmp_path)
+    audio = _speech_like()
+    
+    normalized = refiner.normalize_volume(audio.copy())
+    assert np.any(np.abs(normalized) > COMPRESSION_THRESHOLD), "fixture must exercise compression"
+    
+    separate = refiner.enhance_voice(normalized.copy(), 22050)
+    fused = refiner.refine_dynamics(audio.copy())
+    
+    assert fused.dtype == np.float32
+    assert fused.shape == audio.shape
+    np.testing.assert_allclose(fused, separate, atol=1e-6)
+
+def test_enhance_voice_matches_masked_compressor(tmp_path):
+    """Branchless compressor == the original masked compressor"""
+    refiner = _refiner(tmp_path)
+    normalized = refiner.normalize_volume(_speech_like())
+    assert np.any(np.abs(normalized) > COMPRESSION_THRESHOLD), "fixture must exercise compression"
+    
+    enhanced = refiner.enhance_voice(normalized.copy(), 22050)
+    baseline = _masked_compress(normalized, COMPRESSION_THRESHOLD, COMPRESSION_RATIO)
+    
+    assert enhanced.dtype == np.float32
+    np.testing.assert_allclose(enhanced, baseline, atol=1e-6)
+
+def test_reduce_noise_keeps_dtype_and_length(tmp_path):
+    """Spectral gate returns float32 of the input length and lowers the noise floor"""
+    refiner = _refiner(tmp_path)
+    audio = _speech_like(22050 + 123)
+    
+    reduced = refiner.reduce_noise(audio.copy(), 22050)
+    
+    assert reduced.dtype == np.float32
+    assert reduced.shape == audio.shape
+    
+    # Energy in the gaps between tone bursts should drop
+    t = np.arange(audio.size) / 22050
+    gaps = np.sin(2 * np.pi * 3 * t) < -0.5
+    assert np.sqrt(np.mean(reduced[gaps] ** 2)) < np.sqrt(np.mean(audio[gaps] ** 2))
+
+def test_reduce_noise_short_clip_unchanged(tmp_path):
+    """Clips shorter than one STFT frame pass through untouched"""
+    refiner = _refiner(tmp_path)
+    audio = _speech_like(NOISE_FFT_SIZE - 1)
+    
+    reduced = refiner.reduce_noise(audio.copy(), 22050)
+    
+    np.testing.assert_array_equal(reduced, audio)
+
+def test_split_sentences_abbreviations_and_decimals():
+    """Dr./Mr. and decimals do not end a sentence"""
+    text = "Meet Dr. Smith and Mr. Jones today. It costs 3.5 dollars! Is that a good deal?"
+    
+    assert split_sentences(text) == [
+        "Meet Dr. Smith and Mr. Jones today.",
+        "It costs 3.5 dollars!",
+        "Is that a good deal?"
+    ]
+
+def test_split_sentences_short_fragments():
+    """Fragments under min_length are merged, never dropped"""
+    assert split_sentences("Wow. This is a longer sentence.") == ["Wow. This is a longer sentence."]
+    assert split_sentences("This is a long sentence. Ok.") == ["This is a long sentence. Ok."]
+    assert split_sentences("Hi.") == ["Hi."]
+
+def test_unsupported_output_format_rejected(tmp_path):
+    """Only pcm and mp3 are handled end to end; other codecs fail when the service is built"""
+    assert parse_output_format("pcm_22050") == ('pcm', 22050)
+    assert parse_output_format("mp3_44100_128") == ('mp3', 44100)
+    
+    for output_format in ("ulaw_8000", "alaw_8000", "opus_48000_64", "pcm"):
+        with pytest.raises(ValueError):
+            parse_output_format(output_format)
+    
+    config_path = tmp_path / "config.yaml"
+    shutil.copyfile(CONFIG_PATH, config_path)
+    config = load_config(str(config_path))
+    config['elevenlabs']['output_format'] = "ulaw_8000"
+    
+    with pytest.raises(ValueError, match="Unsupported output format"):
+        ElevenLabsTTS("test-key", config)
+
+def test_load_config_invalidates_on_mtime(tmp_path):
+    """Edits to the YAML file are picked up; returned configs are independent copies"""
+    config_path = tmp_path / "config.yaml"
+    config_path.write_text("value: 1\n")
+    
+    first = load_config(str(config_path))
+    first['value'] = 99
+    assert load_config(str(config_path)) == {'value': 1}
+    
+    config_path.write_text("value: 2\n")
+    stat = os.stat(config_path)
+    os.utime(config_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    
+    assert load_config(config_path) == {'value': 2}
+
+def test_load_config_uses_sidecar(tmp_path, monkeypatch):
+    """A fresh process reads the JSON sidecar instead of parsing YAML"""
+    config_path = tmp_path / "config.yaml"
+    config_path.write_text("paths:\n  logs: ./logs\n")
+    
+    expected = load_config(str(config_path))
+    assert (tmp_path / "config.yaml.json").exists()
+    
+    # Simulate a new process: empty in-memory cache, YAML parsing unavailable
+    load_config.cache_clear()
+    
+    def fail(path):
+        raise AssertionError("YAML should not be parsed")
+    
+    monkeypatch.setattr(utils, '_parse_yaml_config', fail)
+    
+    assert load_config(str(config_path)) == expected
+
+def test_load_config_ignores_stale_sidecar(tmp_path):
+    """A replaced YAML file is re-parsed even if it is older than the sidecar (cp -p, rsync -a)"""
+    config_path = tmp_path / "config.yaml"
+    config_path.write_text("value: 1\n")
+    
+    assert load_config(str(config_path)) == {'value': 1}
+    sidecar_mtime = os.stat(tmp_path / "config.yaml.json").st_mtime_ns
+    
+    # New content carrying an mtime from before the sidecar was written
+    config_path.write_text("value: 22\n")
+    os.utime(config_path, ns=(sidecar_mtime - 10**9, sidecar_mtime - 10**9))
+    load_config.cache_clear()
+    
+    assert load_config(str(config_path)) == {'value': 22}
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -10,11 +10,26 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 
 from src import generate_refined_audio, quick_generate
 
+# Over the 5000 character limit
+_LONG_TEXT = "A" * 6000
+
+_AD_SCRIPT = """
+    Discover the future of fitness with FitAI! 
+    Our revolutionary app uses artificial intelligence to create personalized workout plans 
+    that adapt to your progress in real-time. 
+    Join thousands of users who've already transformed their lives. 
+    Download FitAI today and get your first month free!
+    """
+
+def _print_header(title):
+    """Print a section header and flush it, so it precedes the pipeline's (stderr) logs"""
+    print("\n" + "="*60)
+    print(title)
+    print("="*60, flush=True)
+
 def test_basic_generation():
     """Test 1: Basic audio generation"""
-    print("\n" + "="*60)
-    print("TEST 1: Basic Audio Generation")
-    print("="*60)
+    _print_header("TEST 1: Basic Audio Generation")
     
     text = "Hello world, this is a test of the audio generation system."
     
@@ -33,20 +48,10 @@ def test_basic_generation():
 
 def test_ad_script():
     """Test 2: Realistic ad script"""
-    print("\n" + "="*60)
-    print("TEST 2: Ad Script Generation")
-    print("="*60)
-    
-    text = """
-    Discover the future of fitness with FitAI! 
-    Our revolutionary app uses artificial intelligence to create personalized workout plans 
-    that adapt to your progress in real-time. 
-    Join thousands of users who've already transformed their lives. 
-    Download FitAI today and get your first month free!
-    """
+    _print_header("TEST 2: Ad Script Generation")
     
     result = generate_refined_audio(
-        text=text,
+        text=_AD_SCRIPT,
         output_name="test_ad_script"
     )
     
@@ -66,9 +71,7 @@ def test_ad_script():
 
 def test_different_voice():
     """Test 3: Different voice"""
-    print("\n" + "="*60)
-    print("TEST 3: Different Voice (Adam)")
-    print("="*60)
+    _print_header("TEST 3: Different Voice (Adam)")
     
     text = "This is Adam's voice speaking. Testing different voice characteristics."
     
@@ -92,12 +95,10 @@ def test_different_voice():
 
 def test_error_handling():
     """Test 4: Error handling"""
-    print("\n" + "="*60)
-    print("TEST 4: Error Handling")
-    print("="*60)
+    _print_header("TEST 4: Error Handling")
     
     # Test with empty text
-    print("\nTesting empty text...")
+    print("\nTesting empty text...", flush=True)
     result = quick_generate("")
     
     if not result['success']:
@@ -107,9 +108,8 @@ def test_error_handling():
         return False
     
     # Test with very long text
-    print("\nTesting very long text (>5000 chars)...")
-    long_text = "A" * 6000
-    result = quick_generate(long_text)
+    print("\nTesting very long text (>5000 chars)...", flush=True)
+    result = quick_generate(_LONG_TEXT)
     
     if not result['success']:
         print("✅ Long text correctly rejected")
@@ -122,9 +122,11 @@ def test_error_handling():
 
 def run_all_tests():
     """Run all tests"""
-    print("\n" + "="*60)
-    print("AUDIO PIPELINE TEST SUITE")
-    print("="*60)
+    # Buffer output between headers and test results instead of flushing every line
+    if hasattr(sys.stdout, 'reconfigure'):
+        sys.stdout.reconfigure(line_buffering=False)
+    
+    _print_header("AUDIO PIPELINE TEST SUITE")
     
     tests = [
         ("Basic Generation", test_basic_generation),
@@ -142,11 +144,11 @@ def run_all_tests():
         except Exception as e:
             print(f"\n❌ {test_name} CRASHED: {str(e)}")
             results.append((test_name, False))
+        
+        sys.stdout.flush()
     
     # Print summary
-    print("\n" + "="*60)
-    print("TEST SUMMARY")
-    print("="*60)
+    _print_header("TEST SUMMARY")
     
     for test_name, passed in results:
         status = "✅ PASSED" if passed else "❌ FAILED"
@@ -159,6 +161,8 @@ def run_all_tests():
         print("\n🎉 ALL TESTS PASSED!")
     else:
         print("\n⚠️ SOME TESTS FAILED")
+    
+    sys.stdout.flush()
 
 if __name__ == "__main__":
     run_all_tests()
\ No newline at end of file